@@ -0,0 +1,238 @@
+"""Request, token and cost budgets for AI providers."""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BudgetExceededError(Exception):
+    """Raised when a request can't be admitted within its provider budget."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text and code (about 4 characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+@dataclass
+class ProviderBudget:
+    """Limits and prices for one provider; None means unlimited."""
+
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+    daily_cost: Optional[float] = None
+    cost_per_1k_prompt: float = 0.0
+    cost_per_1k_completion: float = 0.0
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.cost_per_1k_prompt + completion_tokens * self.cost_per_1k_completion) / 1000
+
+
+@dataclass
+class Reservation:
+    """Budget taken by one admitted request, corrected by BudgetManager.settle()."""
+
+    provider: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    entry: List[float]
+
+
+class _ProviderState:
+    def __init__(self, budget: ProviderBudget):
+        self.budget = budget
+        self.window: "deque[List[float]]" = deque()  # [admitted_at, tokens]
+        self.spent = 0.0
+        self.day: Optional[str] = None
+        self.queues: "OrderedDict[str, deque]" = OrderedDict()
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+
+class BudgetManager:
+    """Admits provider requests within RPM, TPM and daily cost limits.
+
+    Requests wait in per-skill queues that take turns, so one busy skill
+    can't starve the others. A request waits at most ``max_wait``
+    seconds; over that, or once the day's cost ceiling is reached,
+    acquire() raises BudgetExceededError. Reservations use an estimate
+    (prompt tokens plus the completion limit) and are corrected with the
+    provider's reported usage in settle(). The rate window is ``window``
+    seconds; the daily budget resets at midnight UTC.
+
+    Add ``admits`` as a node admission check to stop claiming work while
+    a provider is out of budget or backlogged (``max_waiting`` requests).
+    ``provider_for(task)`` names the provider a task will use (None for
+    none), so only that provider's budget holds the task back; without
+    it, any exhausted provider defers every task. A task is admitted only
+    if its estimated request (task text plus ``completion_tokens``) still
+    fits the day's budget, the same test acquire() applies.
+    """
+
+    def __init__(
+        self,
+        budgets: Dict[str, ProviderBudget],
+        max_wait: float = 300.0,
+        max_waiting: int = 32,
+        window: float = 60.0,
+        provider_for: Optional[Callable[[Any], Optional[str]]] = None,
+        completion_tokens: int = 1000
+    ):
+        self.max_wait = max_wait
+        self.max_waiting = max_waiting
+        self.window = window
+        self.provider_for = provider_for
+        self.completion_tokens = completion_tokens
+        self._states = {provider: _ProviderState(budget) for provider, budget in budgets.items()}
+        self._cond = threading.Condition()
+
+    def _roll(self, state: _ProviderState, now: float):
+        """Drop expired window entries and reset the daily spend at midnight UTC."""
+        while state.window and state.window[0][0] <= now - self.window:
+            state.window.popleft()
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        if state.day != day:
+            state.day = day
+            state.spent = 0.0
+
+    @staticmethod
+    def _over_daily(state: _ProviderState, cost: float) -> bool:
+        limit = state.budget.daily_cost
+        return limit is not None and state.spent + cost > limit
+
+    def _capacity_wait(self, state: _ProviderState, tokens: int, now: float) -> float:
+        """Seconds until the window has room for a request of ``tokens``."""
+        budget = state.budget
+        wait = 0.0
+        if budget.rpm and len(state.window) >= budget.rpm:
+            oldest = state.window[len(state.window) - budget.rpm][0]
+            wait = max(wait, oldest + self.window - now)
+        if budget.tpm and state.window:
+            excess = sum(entry[1] for entry in state.window) + tokens - budget.tpm
+            for admitted_at, used in state.window:
+                if excess <= 0:
+                    break
+                excess -= used
+                wait = max(wait, admitted_at + self.window - now)
+        return wait
+
+    def acquire(
+        self, provider: str, prompt_tokens: int, completion_tokens: int = 1000, skill: str = "default"
+    ) -> Optional[Reservation]:
+        """Wait for budget to send a request. Returns None for unbudgeted providers."""
+        state = self._states.get(provider)
+        if state is None:
+            return None
+
+        tokens = prompt_tokens + completion_tokens
+        cost = state.budget.cost(prompt_tokens, completion_tokens)
+        ticket = object()
+        queued_at = time.monotonic()
+        deadline = queued_at + self.max_wait
+
+        with self._cond:
+            state.queues.setdefault(skill, deque()).append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._roll(state, now)
+                    if self._over_daily(state, cost):
+                        state.rejected += 1
+                        raise BudgetExceededError(f"{provider} daily budget of ${state.budget.daily_cost:.2f} is spent")
+
+                    wait = None
+                    skill_turn = next(iter(state.queues))
+                    if skill_turn == skill and state.queues[skill][0] is ticket:
+                        wait = self._capacity_wait(state, tokens, now)
+                        if wait <= 0:
+                            break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        state.rejected += 1
+                        raise BudgetExceededError(f"{provider} rate limit wait exceeded {self.max_wait:.0f}s")
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+
+                # Admitted: this skill goes to the back of the rotation
+                state.queues[skill].popleft()
+                state.queues.move_to_end(skill)
+                entry = [now, float(tokens)]
+                state.window.append(entry)
+                state.spent += cost
+                state.admitted += 1
+                state.wait_time += now - queued_at
+                return Reservation(provider, prompt_tokens, completion_tokens, cost, entry)
+            finally:
+                queue = state.queues.get(skill)
+                if queue is not None:
+                    if ticket in queue:
+                        queue.remove(ticket)
+                    if not queue:
+                        del state.queues[skill]
+                self._cond.notify_all()
+
+    def settle(
+        self, reservation: Optional[Reservation], prompt_tokens: Optional[int], completion_tokens: Optional[int]
+    ):
+        """Replace a reservation's estimate with the provider's reported usage."""
+        if reservation is None or prompt_tokens is None or completion_tokens is None:
+            return
+        state = self._states[reservation.provider]
+        with self._cond:
+            reservation.entry[1] = float(prompt_tokens + completion_tokens)
+            actual = state.budget.cost(prompt_tokens, completion_tokens)
+            state.spent += actual - reservation.cost
+            reservation.cost = actual
+            self._cond.notify_all()
+
+    def admits(self, task: Any = None) -> bool:
+        """False while the task's provider can't afford it or is backlogged."""
+        prompt_tokens = estimate_tokens(_task_text(task))
+        if task is not None and self.provider_for is not None:
+            provider = self.provider_for(task)
+            states = [self._states[provider]] if provider in self._states else []
+        else:
+            states = list(self._states.values())
+        with self._cond:
+            now = time.monotonic()
+            for state in states:
+                self._roll(state, now)
+                if self._over_daily(state, state.budget.cost(prompt_tokens, self.completion_tokens)):
+                    return False
+                if state.waiting >= self.max_waiting:
+                    return False
+            return True
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            now = time.monotonic()
+            stats = {}
+            for provider, state in self._states.items():
+                self._roll(state, now)
+                stats[provider] = {
+                    "requests_in_window": len(state.window),
+                    "tokens_in_window": int(sum(entry[1] for entry in state.window)),
+                    "spent_today": state.spent,
+                    "waiting": state.waiting,
+                    "admitted": state.admitted,
+                    "rejected": state.rejected,
+                    "avg_wait": state.wait_time / state.admitted if state.admitted else 0.0,
+                }
+            return stats
+
+
+def _task_text(task: Any) -> str:
+    """The parts of a task that end up in a model prompt."""
+    if task is None:
+        return ""
+    requirements = getattr(task, "requirements", None) or []
+    return "\n".join([getattr(task, "title", ""), getattr(task, "description", ""), *map(str, requirements)])
@@ -0,0 +1,328 @@
+"""Caches for MoltSwarm: API read responses and LLM completions."""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# Seconds a cached response is served without contacting the server.
+DEFAULT_TTLS = {
+    "post": 30.0,
+    "comments": 10.0,
+    "feed": 30.0,
+    "search": 60.0,
+}
+
+
+def endpoint_kind(endpoint: str) -> str:
+    """Classify an API endpoint for TTL lookup.
+
+    ``posts/{id}/comments`` -> "comments", ``posts/{id}`` -> "post",
+    ``posts`` and ``feed`` -> "feed", ``search`` -> "search".
+    """
+    parts = endpoint.strip("/").split("/")
+    if parts[0] == "posts":
+        if len(parts) == 1:
+            return "feed"
+        if len(parts) == 3 and parts[2] == "comments":
+            return "comments"
+        if len(parts) == 2:
+            return "post"
+    elif parts[0] in ("feed", "search"):
+        return parts[0]
+    return "other"
+
+
+@dataclass
+class CacheEntry:
+    """A cached decoded response."""
+
+    endpoint: str
+    data: Any
+    size: int
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for revalidating this entry with the server."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Byte-bounded LRU cache of GET responses with per-endpoint TTLs.
+
+    Stale entries that carry an ETag or Last-Modified header are kept and
+    revalidated with a conditional request instead of being refetched.
+    Cached data is shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 0.0,
+    ):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Build a cache key from an endpoint and its query parameters."""
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        return (endpoint.strip("/"), items)
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint_kind(endpoint), self.default_ttl)
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        return self.ttl_for(endpoint) > 0
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get an entry (fresh or stale) and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def revalidated(self, key: Hashable, entry: CacheEntry):
+        """Extend an entry's lifetime after a 304 Not Modified."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl_for(entry.endpoint)
+            self.hits += 1
+            self.revalidations += 1
+
+    def store(
+        self,
+        key: Hashable,
+        endpoint: str,
+        data: Any,
+        size: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """Store a response, counting it as a miss and evicting LRU entries."""
+        headers = headers or {}
+        if size is None:
+            size = len(json.dumps(data, default=str))
+
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes:
+                return
+            self._remove(key)
+            self._entries[key] = CacheEntry(
+                endpoint=key[0],
+                data=data,
+                size=size,
+                expires_at=time.monotonic() + self.ttl_for(endpoint),
+                etag=headers.get("ETag"),
+                last_modified=headers.get("Last-Modified"),
+            )
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: str):
+        """Drop every cached response for an endpoint, whatever its params."""
+        endpoint = endpoint.strip("/")
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.endpoint == endpoint]:
+                self._remove(key)
+
+    def invalidate_kind(self, kind: str):
+        """Drop every cached response of one endpoint kind (e.g. "feed")."""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if endpoint_kind(e.endpoint) == kind]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+class LLMResponseCache:
+    """Two-tier cache of model completions.
+
+    Keys are a hash of provider, model and the whitespace-normalized
+    prompt, so re-posted jobs with the same content hit the cache. The
+    memory tier is an LRU of ``max_memory_entries``. The optional disk tier
+    is a SQLite file bounded by ``max_disk_bytes`` (least recently used
+    rows are evicted first). Entries older than ``ttl`` seconds are
+    ignored and removed.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 86400,
+        max_memory_entries: int = 256,
+        max_disk_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.path = os.path.expanduser(path) if path else None
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+            self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(provider: str, model: Optional[str], prompt: str) -> str:
+        """Cache key for a completion request."""
+        normalized = re.sub(r"\s+", " ", prompt).strip()
+        raw = json.dumps([provider, model or "", normalized])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a completion in memory, then on disk."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if now - created <= self.ttl:
+                        self._db.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, value, created)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """Store a completion in both tiers."""
+        now = time.time()
+        with self._lock:
+            self.stores += 1
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            size = len(value.encode())
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._db.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+            while total > self.max_disk_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM completions ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM completions WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.evictions += 1
+            self._db.commit()
+
+    def _remember(self, key: str, value: str, created: float):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters per tier."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
@@ -1,37 +1,348 @@
 """Moltbook API client for MoltSwarm."""
 
+import asyncio
+import threading
 import time
+import uuid
 import requests
-from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from typing import Optional, Dict, Any, List, Tuple, Iterator, AsyncIterator, Callable, Hashable
+
+from moltswarm.cache import ResponseCache
+from moltswarm.config import MoltbookConfig
+from moltswarm.protocols import parse_timestamp, server_clock
+from moltswarm.resilience import CircuitBreaker, RetryPolicy
+
+
+class _Call:
+    """An in-flight request shared by coalesced callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Singleflight: concurrent calls with the same key share one execution."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed vs coalesced call counts."""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesce_rate": self.coalesced / total if total else 0.0,
+            }
+
+
+def slim_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the post/comment fields MoltSwarm uses (plus submolt name)."""
+    author = item.get("author") or {}
+    slim = {
+        "id": item.get("id", ""),
+        "content": item.get("content") or "",
+        "author": {"name": author.get("name", "") if isinstance(author, dict) else ""},
+        "created_at": item.get("created_at", ""),
+    }
+    submolt = item.get("submolt")
+    if submolt:
+        slim["submolt"] = {"name": submolt.get("name", "")} if isinstance(submolt, dict) else submolt
+    return slim
+
+
+def new_idempotency_key() -> str:
+    """Generate a client-side key for an idempotent write."""
+    return uuid.uuid4().hex[:16]
+
+
+def pool_size_for(concurrency: int) -> int:
+    """Keep-alive connections needed for a node running ``concurrency`` handlers.
+
+    Each handler may hold a claim check and a delivery at once, plus one
+    connection for discovery.
+    """
+    return max(10, 2 * concurrency + 1)
 
 
 class MoltbookClient:
     """Client for interacting with Moltbook API."""
 
-    def __init__(self, api_key: str, base_url: str = "https://www.moltbook.com/api/v1"):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://www.moltbook.com/api/v1",
+        cache: Optional[ResponseCache] = None,
+        coalesce_reads: bool = True,
+        timeout: Tuple[float, float] = (5.0, 30.0),
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        pool_size: Optional[int] = None,
+        concurrency: int = 1,
+        compress: bool = True
+    ):
         self.api_key = api_key
         self.base_url = base_url
+        self.cache = cache
+        self.coalescer = RequestCoalescer() if coalesce_reads else None
+        self.timeout = timeout  # (connect, read) seconds
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(name="moltbook")
+        # Deadline and claim expiry checks read the shared server clock
+        self.clock = server_clock
+        self.rate_limited_at: Optional[float] = None  # monotonic time of last 429
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         })
 
+        # Size the keep-alive pool to the node's concurrency
+        self.pool_size = pool_size or pool_size_for(concurrency)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if compress:
+            # Includes br/zstd when urllib3 has the decoders installed
+            self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        else:
+            self.session.headers["Accept-Encoding"] = "identity"
+
+    @classmethod
+    def from_config(cls, config: MoltbookConfig, concurrency: int = 1) -> "MoltbookClient":
+        """Create a client from Moltbook configuration.
+
+        ``concurrency`` is the node's handler concurrency; it sizes the
+        connection pool unless ``config.pool_size`` is set.
+        """
+        cache = None
+        if config.cache:
+            cache = ResponseCache(max_bytes=config.cache_max_bytes, ttls=config.cache_ttls)
+        return cls(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            cache=cache,
+            coalesce_reads=config.coalesce_reads,
+            timeout=(config.connect_timeout, config.read_timeout),
+            retry=RetryPolicy(
+                max_retries=config.max_retries,
+                backoff_base=config.backoff_base,
+                backoff_max=config.backoff_max,
+            ),
+            breaker=CircuitBreaker(
+                name="moltbook",
+                failure_threshold=config.breaker_threshold,
+                reset_timeout=config.breaker_reset_timeout,
+            ),
+            pool_size=config.pool_size,
+            concurrency=concurrency,
+            compress=config.compress,
+        )
+
     def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Make an API request."""
+        """Make an API request.
+
+        Identical concurrent GETs are coalesced into one HTTP request whose
+        decoded response is shared by every caller.
+        """
+        if method == "GET" and self.coalescer is not None:
+            key = ResponseCache.key(endpoint, kwargs.get("params"))
+            return self.coalescer.do(key, lambda: self._get(endpoint, **kwargs))
+        if method == "GET":
+            return self._get(endpoint, **kwargs)
+        return self._send(method, endpoint, **kwargs).json()
+
+    def _get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        if self.cache is not None and self.cache.is_cacheable(endpoint):
+            return self._cached_get(endpoint, **kwargs)
+        return self._send("GET", endpoint, **kwargs).json()
+
+    def _send(self, method: str, endpoint: str, retry: bool = True, **kwargs) -> requests.Response:
+        """Send a request, waiting out rate limits.
+
+        Connection errors, timeouts and 5xx responses are retried with
+        jittered backoff according to ``self.retry`` (unless ``retry`` is
+        False) and counted by the circuit breaker. While the breaker is
+        open, CircuitOpenError is raised without touching the network.
+        """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        response = self.session.request(method, url, **kwargs)
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+
+        while True:
+            self.breaker.check()
+            try:
+                sent_at = time.time()
+                response = self.session.request(method, url, **kwargs)
+                self.clock.observe_date_header(
+                    response.headers.get("Date"), (sent_at + time.time()) / 2
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self.breaker.record_failure()
+                if not (retry and self.retry.should_retry(method, attempt)):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                # Any other transport error still settles a half-open probe
+                self.breaker.record_failure()
+                raise
+
+            if response.status_code == 429:
+                # Rate limited
+                self.breaker.record_success()
+                self.rate_limited_at = time.monotonic()
+                data = response.json()
+                retry_after = data.get("retry_after_seconds", 60)
+                print(f"Rate limited. Waiting {retry_after}s...")
+                time.sleep(retry_after)
+                continue
+
+            if response.status_code in self.retry.retry_statuses:
+                self.breaker.record_failure()
+                if retry and self.retry.should_retry(method, attempt):
+                    time.sleep(self.retry.delay(attempt))
+                    attempt += 1
+                    continue
+            else:
+                self.breaker.record_success()
+
+            response.raise_for_status()
+            return response
+
+    def _cached_get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """GET through the response cache, revalidating stale entries."""
+        key = self.cache.key(endpoint, kwargs.get("params"))
+        entry = self.cache.lookup(key)
+        if entry is not None and entry.is_fresh():
+            self.cache.record_hit()
+            return entry.data
+
+        if entry is not None:
+            kwargs["headers"] = {**entry.conditional_headers(), **kwargs.get("headers", {})}
 
-        if response.status_code == 429:
-            # Rate limited
-            data = response.json()
-            retry_after = data.get("retry_after_seconds", 60)
-            print(f"Rate limited. Waiting {retry_after}s...")
-            time.sleep(retry_after)
-            return self._request(method, endpoint, **kwargs)
+        response = self._send("GET", endpoint, **kwargs)
+        if entry is not None and response.status_code == 304:
+            self.cache.revalidated(key, entry)
+            return entry.data
 
-        response.raise_for_status()
-        return response.json()
+        data = response.json()
+        content = getattr(response, "content", None)
+        self.cache.store(
+            key,
+            endpoint,
+            data,
+            size=len(content) if isinstance(content, bytes) else None,
+            headers=response.headers,
+        )
+        return data
+
+    def _stream_items(self, endpoint: str, list_key: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield slimmed items of a list response, decoding incrementally.
+
+        With ``ijson`` installed items are parsed straight off the socket, so
+        parsing starts before the download finishes and only one raw item is
+        alive at a time. Without it the body is decoded with ``json()`` and
+        slimmed item by item. When the response cache is enabled the cached
+        (already decoded) response is used instead.
+        """
+        if self.cache is not None and self.cache.is_cacheable(endpoint):
+            for item in self._request("GET", endpoint, **kwargs).get(list_key, []):
+                yield slim_item(item)
+            return
+
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+
+        response = self._send("GET", endpoint, stream=True, **kwargs)
+        try:
+            if ijson is None:
+                items = response.json().get(list_key, [])
+            else:
+                response.raw.decode_content = True
+                items = ijson.items(response.raw, f"{list_key}.item")
+            for item in items:
+                yield slim_item(item)
+        finally:
+            response.close()
+
+    def _invalidate(self, endpoint: str):
+        if self.cache is not None:
+            self.cache.invalidate(endpoint)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Response cache counters (empty if caching is disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def transport_stats(self) -> Dict[str, Any]:
+        """Connection reuse counters from the underlying urllib3 pools."""
+        opened = 0
+        requests_sent = 0
+        adapters = {id(a): a for a in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = getattr(adapter, "poolmanager", None)
+            if pools is None:
+                continue
+            for key in list(pools.pools.keys()):
+                pool = pools.pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            "pool_size": self.pool_size,
+            "connections_opened": opened,
+            "requests": requests_sent,
+            "reuse_rate": 1 - opened / requests_sent if requests_sent else 0.0,
+        }
+
+    def clock_stats(self) -> Dict[str, Any]:
+        """Estimated server clock offset (server - local, seconds)."""
+        return self.clock.stats()
+
+    def coalesce_stats(self) -> Dict[str, Any]:
+        """Request coalescing counters (empty if coalescing is disabled)."""
+        return self.coalescer.stats() if self.coalescer is not None else {}
 
     # Agent methods
 
@@ -59,7 +370,10 @@ class MoltbookClient:
         data = {"submolt": submolt, "title": title, "content": content}
         if url:
             data["url"] = url
-        return self._request("POST", "posts", json=data)
+        result = self._request("POST", "posts", json=data)
+        if self.cache is not None:
+            self.cache.invalidate_kind("feed")
+        return result
 
     def get_post(self, post_id: str) -> Dict[str, Any]:
         """Get a single post."""
@@ -79,11 +393,43 @@ class MoltbookClient:
         result = self._request("GET", "posts", params=params)
         return result.get("posts", [])
 
+    def get_feed_page(
+        self,
+        sort: str = "new",
+        limit: int = 25,
+        submolt: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of the feed. Returns (posts, next_cursor)."""
+        params = {"sort": sort, "limit": limit}
+        if submolt:
+            params["submolt"] = submolt
+        if cursor:
+            params["cursor"] = cursor
+        result = self._request("GET", "posts", params=params)
+        return result.get("posts", []), result.get("next_cursor")
+
     def get_personalized_feed(self, sort: str = "new", limit: int = 25) -> List[Dict[str, Any]]:
         """Get your personalized feed."""
         result = self._request("GET", "feed", params={"sort": sort, "limit": limit})
         return result.get("posts", [])
 
+    def iter_feed(
+        self,
+        sort: str = "new",
+        limit: int = 25,
+        submolt: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the feed, yielding slimmed posts one at a time."""
+        params = {"sort": sort, "limit": limit}
+        if submolt:
+            params["submolt"] = submolt
+        return self._stream_items("posts", "posts", params=params)
+
+    def iter_personalized_feed(self, sort: str = "new", limit: int = 25) -> Iterator[Dict[str, Any]]:
+        """Stream your personalized feed, yielding slimmed posts."""
+        return self._stream_items("feed", "posts", params={"sort": sort, "limit": limit})
+
     def search_posts(
         self,
         query: str,
@@ -104,24 +450,154 @@ class MoltbookClient:
         self,
         post_id: str,
         content: str,
-        parent_id: Optional[str] = None
+        parent_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Add a comment to a post."""
+        """Add a comment to a post.
+
+        With an ``idempotency_key`` the key is embedded in the comment (and
+        sent as an Idempotency-Key header) and failed attempts are retried.
+        Before each retry the post's newest comments are checked for the
+        key, so a comment that landed despite the error is not posted twice.
+        """
+        endpoint = f"posts/{post_id}/comments"
         data = {"content": content}
         if parent_id:
             data["parent_id"] = parent_id
-        return self._request("POST", f"posts/{post_id}/comments", json=data)
 
-    def get_comments(self, post_id: str, sort: str = "new") -> List[Dict[str, Any]]:
-        """Get comments on a post."""
-        result = self._request("GET", f"posts/{post_id}/comments", params={"sort": sort})
-        return result.get("comments", [])
+        if not idempotency_key:
+            result = self._request("POST", endpoint, json=data)
+            self._invalidate(endpoint)
+            return result
+
+        marker = f"`ref={idempotency_key}`"
+        data["content"] = f"{content}\n\n{marker}"
+        headers = {"Idempotency-Key": idempotency_key}
+        attempt = 0
+        while True:
+            try:
+                result = self._send("POST", endpoint, retry=False, json=data, headers=headers).json()
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(e.response, "status_code", None)
+                if status is not None and status not in self.retry.retry_statuses:
+                    raise
+                if attempt >= self.retry.max_retries:
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+
+                existing = self._find_comment(post_id, marker)
+                if existing is not None:
+                    result = {"success": True, "comment": existing, "deduplicated": True}
+                    break
+
+        self._invalidate(endpoint)
+        return result
+
+    def _find_comment(self, post_id: str, marker: str, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """Find one of the post's newest comments containing ``marker``."""
+        self._invalidate(f"posts/{post_id}/comments")
+        comments, _ = self.get_comments_page(post_id, sort="new", limit=limit)
+        for comment in comments:
+            if marker in (comment.get("content") or ""):
+                return comment
+        return None
+
+    def get_comments(
+        self,
+        post_id: str,
+        sort: str = "new",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get comments on a post.
+
+        Without paging arguments the full comment list is returned. With
+        ``limit``/``cursor`` a single page is returned. With ``since`` (an
+        ISO timestamp, usually the newest ``created_at`` already seen) pages
+        are fetched until older comments are reached, and only comments at
+        or after ``since`` are returned.
+        """
+        if since is not None:
+            return list(self.iter_comments(post_id, sort=sort, limit=limit or 50, since=since))
+        if limit is None and cursor is None:
+            result = self._request("GET", f"posts/{post_id}/comments", params={"sort": sort})
+            return result.get("comments", [])
+        comments, _ = self.get_comments_page(post_id, sort=sort, limit=limit or 50, cursor=cursor)
+        return comments
+
+    def get_comments_page(
+        self,
+        post_id: str,
+        sort: str = "new",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of comments. Returns (comments, next_cursor)."""
+        params = {"sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        result = self._request("GET", f"posts/{post_id}/comments", params=params)
+        return result.get("comments", []), result.get("next_cursor")
+
+    def stream_comments(self, post_id: str, sort: str = "new") -> Iterator[Dict[str, Any]]:
+        """Stream all comments on a post, yielding slimmed comments."""
+        return self._stream_items(f"posts/{post_id}/comments", "comments", params={"sort": sort})
+
+    def iter_comments(
+        self,
+        post_id: str,
+        sort: str = "new",
+        limit: int = 50,
+        since: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over comments page by page."""
+        since_ts = parse_timestamp(since) if since else None
+        cursor = None
+        while True:
+            comments, cursor = self.get_comments_page(post_id, sort=sort, limit=limit, cursor=cursor)
+            for comment in comments:
+                if _is_older(comment, since_ts):
+                    if sort == "new":
+                        return
+                    continue
+                yield comment
+            if not cursor or not comments:
+                return
+
+    async def aiter_comments(
+        self,
+        post_id: str,
+        sort: str = "new",
+        limit: int = 50,
+        since: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of iter_comments; pages are fetched in a thread."""
+        loop = asyncio.get_event_loop()
+        since_ts = parse_timestamp(since) if since else None
+        cursor = None
+        while True:
+            comments, cursor = await loop.run_in_executor(
+                None, lambda c=cursor: self.get_comments_page(post_id, sort, limit, c)
+            )
+            for comment in comments:
+                if _is_older(comment, since_ts):
+                    if sort == "new":
+                        return
+                    continue
+                yield comment
+            if not cursor or not comments:
+                return
 
     # Voting methods
 
     def upvote_post(self, post_id: str) -> Dict[str, Any]:
         """Upvote a post."""
-        return self._request("POST", f"posts/{post_id}/upvote")
+        result = self._request("POST", f"posts/{post_id}/upvote")
+        self._invalidate(f"posts/{post_id}")
+        return result
 
     def upvote_comment(self, comment_id: str) -> Dict[str, Any]:
         """Upvote a comment."""
@@ -149,3 +625,11 @@ class MoltbookClient:
     def unsubscribe(self, submolt: str) -> Dict[str, Any]:
         """Unsubscribe from a submolt."""
         return self._request("DELETE", f"submolts/{submolt}/subscribe")
+
+
+def _is_older(comment: Dict[str, Any], since_ts: Optional[float]) -> bool:
+    """Check if a comment was created strictly before ``since_ts``."""
+    if since_ts is None:
+        return False
+    created_at = parse_timestamp(comment.get("created_at", ""))
+    return created_at is not None and created_at < since_ts
@@ -13,6 +13,27 @@ class MoltbookConfig:
     api_key: str
     base_url: str = "https://www.moltbook.com/api/v1"
 
+    # Response cache for read endpoints (opt-in)
+    cache: bool = False
+    cache_max_bytes: int = 8 * 1024 * 1024
+    cache_ttls: dict = field(default_factory=dict)  # e.g. {"comments": 10, "feed": 30}
+
+    # Share one HTTP request between identical concurrent GETs
+    coalesce_reads: bool = True
+
+    # Timeouts (seconds), retries and circuit breaker
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    breaker_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+
+    # HTTP transport
+    pool_size: Optional[int] = None  # keep-alive connections; default follows node concurrency
+    compress: bool = True  # Accept-Encoding gzip/deflate (+br/zstd if decoders installed)
+
 
 @dataclass
 class NodeConfig:
@@ -22,6 +43,18 @@ class NodeConfig:
     skills: list = field(default_factory=list)
     heartbeat_interval: int = 14400  # 4 hours
     auto_claim: bool = True
+    max_concurrency: int = 1  # handlers running at once
+    plan_subscriptions: bool = False  # subscribe to job submolts, poll global feed less
+    backfill: bool = False  # crawl older posts for open jobs
+    backfill_max_age: int = 604800  # 7 days
+
+    # Seen-job filter (rotating Bloom filters)
+    seen_capacity: int = 100000
+    seen_error_rate: float = 0.01
+    seen_rotate_after: int = 86400
+    seen_max_bytes: Optional[int] = None
+    max_tracked_posts: int = 10000  # posts whose claim comments are indexed (LRU)
+    max_queued: int = 1000  # tasks waiting to be claimed (e.g. deferred by admission checks)
 
 
 @dataclass
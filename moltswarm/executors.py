@@ -9,10 +9,98 @@ Supports multiple execution strategies:
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import queue
+import signal
 import subprocess
+import threading
+import time
 import json
 
+from moltswarm.budget import BudgetExceededError, BudgetManager, estimate_tokens
+from moltswarm.cache import LLMResponseCache
+from moltswarm.resilience import CircuitBreaker
+
+logger = logging.getLogger("MoltSwarm")
+
+# Result prefixes that mark a failed execution (for executors without run())
+ERROR_PREFIXES = ("Error:", "OpenAI Error:", "Anthropic Error:", "Ollama Error:")
+
+PROVIDER_NAMES = {"openai": "OpenAI", "anthropic": "Anthropic", "ollama": "Ollama"}
+MISSING_PACKAGE = {
+    "openai": "Error: openai package not installed. Run: pip install openai",
+    "anthropic": "Error: anthropic package not installed. Run: pip install anthropic",
+    "ollama": "Error: requests package not installed",
+}
+
+
+@dataclass
+class ExecutionResult:
+    """Structured outcome of one execution."""
+
+    SUCCESS = "success"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+
+    status: str
+    output: str = ""
+    error: Optional[str] = None
+    latency: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    backend: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.SUCCESS
+
+    @property
+    def tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+    @classmethod
+    def from_output(cls, output: Any, latency: float = 0.0, **kwargs) -> "ExecutionResult":
+        """Classify a bare execute() return value by its error prefix.
+
+        Only a fallback for executors that don't implement run(); the
+        built-in executors report status from exceptions and exit codes.
+        """
+        output = "" if output is None else str(output)
+        if output.startswith(ERROR_PREFIXES):
+            status = cls.TIMEOUT if "timed out" in output.lower() else cls.ERROR
+            return cls(status, output=output, error=output, latency=latency, **kwargs)
+        return cls(cls.SUCCESS, output=output, latency=latency, **kwargs)
+
+    @classmethod
+    def from_exception(cls, error: Exception, latency: float = 0.0, **kwargs) -> "ExecutionResult":
+        timed_out = isinstance(error, (TimeoutError, asyncio.TimeoutError, subprocess.TimeoutExpired)) or (
+            "timeout" in type(error).__name__.lower()
+        )
+        status = cls.TIMEOUT if timed_out else cls.ERROR
+        return cls(status, output=f"Error: {error}", error=str(error), latency=latency, **kwargs)
+
+
+def _failed(message: str) -> ExecutionResult:
+    return ExecutionResult(ExecutionResult.ERROR, output=message, error=message)
+
+
+def _timed_out(message: str, started: float) -> ExecutionResult:
+    return ExecutionResult(ExecutionResult.TIMEOUT, output=message, error=message, latency=time.monotonic() - started)
+
+
+def _not_found(started: float) -> ExecutionResult:
+    message = "Claude Code not found. Please install or provide correct path."
+    return ExecutionResult(ExecutionResult.ERROR, output=message, error=message, latency=time.monotonic() - started)
+
 
 class Executor(ABC):
     """Base class for task executors."""
@@ -22,6 +110,233 @@ class Executor(ABC):
         """Execute a task and return the result."""
         pass
 
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        """Execute a task without blocking the event loop.
+
+        The default runs execute() in a worker thread; executors with a
+        native async path override this.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.execute, task, context)
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Execute a task and return a structured result."""
+        started = time.monotonic()
+        try:
+            output = self.execute(task, context)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+        return ExecutionResult.from_output(output, time.monotonic() - started)
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Async run(), built on execute_async()."""
+        started = time.monotonic()
+        try:
+            output = await self.execute_async(task, context)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+        return ExecutionResult.from_output(output, time.monotonic() - started)
+
+    def stream(
+        self, task: Any, context: Optional[Dict] = None, cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """Yield the result in chunks as it is produced.
+
+        The default yields the whole execute() result as one chunk;
+        executors that can produce partial output override this.
+        """
+        yield self.execute(task, context)
+
+    async def astream(
+        self, task: Any, context: Optional[Dict] = None, cancel: Optional[threading.Event] = None
+    ) -> AsyncIterator[str]:
+        """Async iterator over stream() chunks.
+
+        stream() runs in a worker thread. Leaving the loop early, or setting
+        ``cancel``, stops it at the next chunk and closes the upstream stream.
+        """
+        loop = asyncio.get_event_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                pass  # loop already closed
+
+        def pump():
+            source = self.stream(task, context, cancel)
+            try:
+                for chunk in source:
+                    if stop.is_set() or (cancel is not None and cancel.is_set()):
+                        break
+                    put((chunk, None))
+            except Exception as e:
+                put((None, e))
+            finally:
+                source.close()
+                put(None)
+
+        loop.run_in_executor(None, pump)
+        try:
+            while True:
+                item = await chunks.get()
+                if item is None:
+                    return
+                chunk, error = item
+                if error is not None:
+                    raise error
+                yield chunk
+        finally:
+            stop.set()
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a subprocess run."""
+
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    truncated: bool = False
+
+
+class _SlotLimiter:
+    """Counting semaphore shared by event loops in different threads.
+
+    asyncio.Semaphore belongs to one loop; this one hands slots to waiters
+    on any loop, in arrival order, without tying up a thread per waiter.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: "deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = deque()
+
+    async def __aenter__(self):
+        loop = asyncio.get_event_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except BaseException:
+            with self._lock:
+                waiting = (loop, future) in self._waiters
+                if waiting:
+                    self._waiters.remove((loop, future))
+            # Granted just as we were cancelled: pass the slot on
+            if not waiting and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:  # the waiter's loop has closed
+                    continue
+            self._value += 1
+
+    def _grant(self, future: asyncio.Future):
+        if future.done():  # cancelled while the grant was in flight
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class SubprocessRunner:
+    """Runs CLI tools as non-blocking subprocesses.
+
+    At most ``max_concurrency`` processes run at once (others wait for a
+    slot). stdout/stderr are read incrementally and capped at
+    ``max_output`` bytes each; excess output is drained and discarded.
+    Each process gets its own process group, which is killed on timeout
+    or cancellation so child processes don't outlive the task. Share one
+    runner between executors to share the concurrency limit; the limit
+    holds across threads and event loops.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_output: int = 1024 * 1024):
+        self.max_concurrency = max_concurrency
+        self.max_output = max_output
+        self._slots = _SlotLimiter(max_concurrency)
+
+    async def run(self, cmd: List[str], timeout: Optional[float] = None) -> ProcessResult:
+        """Run ``cmd`` and collect its (capped) output."""
+        async with self._slots:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            stdout: List[bytes] = []
+            stderr: List[bytes] = []
+            truncated = [False]
+
+            async def read(stream, chunks):
+                size = 0
+                while True:
+                    chunk = await stream.read(65536)
+                    if not chunk:
+                        return
+                    if size < self.max_output:
+                        chunks.append(chunk[:self.max_output - size])
+                    if size + len(chunk) > self.max_output:
+                        truncated[0] = True
+                    size += len(chunk)
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(read(process.stdout, stdout), read(process.stderr, stderr), process.wait()),
+                    timeout=timeout,
+                )
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+                await self._kill(process)
+            except BaseException:
+                await self._kill(process)
+                raise
+
+            return ProcessResult(
+                returncode=process.returncode,
+                stdout=b"".join(stdout).decode("utf-8", errors="replace"),
+                stderr=b"".join(stderr).decode("utf-8", errors="replace"),
+                timed_out=timed_out,
+                truncated=truncated[0],
+            )
+
+    @staticmethod
+    async def _kill(process):
+        """Kill the process group and reap the process."""
+        if process.returncode is None:
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+
+
+# Shared by executors that aren't given their own runner
+default_runner = SubprocessRunner()
+
 
 class RuleBasedExecutor(Executor):
     """Simple rule-based execution using templates."""
@@ -124,24 +439,236 @@ Status: Acknowledged
             return 'python'
 
 
+class _ToolWorker:
+    """One long-lived tool process speaking JSON lines on stdin/stdout."""
+
+    def __init__(self, cmd: List[str]):
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        self.tasks_done = 0
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # EOF
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, payload: str, timeout: float) -> str:
+        """Send one task line and wait for one result line."""
+        self.process.stdin.write(payload.replace("\n", " ") + "\n")
+        self.process.stdin.flush()
+        line = self._lines.get(timeout=timeout)
+        if line is None:
+            raise RuntimeError("tool worker exited")
+        self.tasks_done += 1
+        return line.rstrip("\n")
+
+    def stop(self):
+        if self.alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except Exception:
+                pass
+        if self.alive():
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+
+
+class ToolWorkerPool:
+    """Pool of persistent tool processes (JSON-lines protocol).
+
+    Each worker reads one task JSON object per line on stdin (the payload
+    ToolExecutor._build_prompt produces) and writes one line per task on
+    stdout: either ``{"result": "..."}``, ``{"error": "..."}`` or plain
+    text. Workers that die or time out are replaced; workers are recycled
+    after ``max_tasks_per_worker`` tasks. Idle workers are health checked
+    every ``health_interval`` seconds as workers are checked back in. A
+    worker that fails to start frees its slot, so the next task retries
+    the spawn instead of waiting forever.
+    """
+
+    def __init__(
+        self, cmd: List[str], size: int = 2, max_tasks_per_worker: int = 100, health_interval: float = 30.0
+    ):
+        self.cmd = cmd
+        self.size = size
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.health_interval = health_interval
+        self._idle: "queue.Queue[_ToolWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._last_health_check = time.monotonic()
+        self.restarts = 0
+        self.recycled = 0
+        self.spawn_failures = 0
+
+    def _spawn(self) -> _ToolWorker:
+        """Start a worker for a slot already counted in ``_started``; free the slot on failure."""
+        try:
+            return _ToolWorker(self.cmd)
+        except Exception:
+            with self._lock:
+                self._started -= 1
+                self.spawn_failures += 1
+            raise
+
+    def _replace(self, worker: _ToolWorker):
+        """Stop a worker and put a fresh one in its slot (or free the slot)."""
+        worker.stop()
+        try:
+            self._idle.put(self._spawn())
+        except Exception as e:
+            logger.warning(f"Could not restart tool worker: {e}")
+
+    def _checkout(self, timeout: Optional[float] = None) -> _ToolWorker:
+        spawn = False
+        with self._lock:
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                spawn = True
+        if spawn:
+            return self._spawn()
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError("no tool worker became available") from None
+        if not worker.alive():
+            self.restarts += 1
+            worker.stop()
+            worker = self._spawn()
+        return worker
+
+    def _checkin(self, worker: _ToolWorker):
+        if worker.tasks_done >= self.max_tasks_per_worker:
+            self.recycled += 1
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        if time.monotonic() - self._last_health_check >= self.health_interval:
+            self.health_check()
+
+    def submit(self, payload: str, timeout: float) -> str:
+        """Run one task on an idle worker and return its raw result line."""
+        worker = self._checkout(timeout)
+        try:
+            line = worker.request(payload, timeout)
+        except (queue.Empty, RuntimeError, OSError):
+            # Hung or crashed: replace the worker and report the failure
+            self.restarts += 1
+            self._replace(worker)
+            raise
+        self._checkin(worker)
+        return line
+
+    def health_check(self) -> int:
+        """Replace dead idle workers. Returns how many were restarted."""
+        self._last_health_check = time.monotonic()
+        restarted = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker.alive():
+                self._idle.put(worker)
+            else:
+                self._replace(worker)
+                restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def close(self):
+        """Stop all idle workers."""
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+        self._started = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "started": self._started,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "recycled": self.recycled,
+            "spawn_failures": self.spawn_failures,
+        }
+
+
 class ToolExecutor(Executor):
     """Execute tasks by calling external tools or scripts."""
 
-    def __init__(self, command: str, args: Optional[list] = None):
+    def __init__(
+        self,
+        command: str,
+        args: Optional[list] = None,
+        timeout: float = 60,
+        runner: Optional[SubprocessRunner] = None,
+        persistent: bool = False,
+        workers: int = 2,
+        max_tasks_per_worker: int = 100
+    ):
         """
         Initialize with a command template.
 
         Args:
             command: Command to run (e.g., 'claude', 'python', 'ollama')
             args: Optional arguments template
+            timeout: Seconds before the command is killed
+            runner: Subprocess runner for execute_async (default: shared)
+            persistent: Keep long-lived worker processes that read task
+                JSON lines on stdin instead of starting one per task
+            workers: Number of persistent worker processes
+            max_tasks_per_worker: Recycle a worker after this many tasks
         """
         self.command = command
         self.args = args or []
+        self.timeout = timeout
+        self.runner = runner or default_runner
+        self.pool = None
+        if persistent:
+            self.pool = ToolWorkerPool(
+                [command] + self.args, size=workers, max_tasks_per_worker=max_tasks_per_worker
+            )
+
+    def close(self):
+        """Stop persistent worker processes, if any."""
+        if self.pool:
+            self.pool.close()
 
     def execute(self, task: Any, context: Optional[Dict] = None) -> str:
         """Execute task using external tool."""
+        return self.run(task, context).output
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Execute task; the outcome comes from the tool's exit status."""
         # Build prompt from task
         prompt = self._build_prompt(task)
+        started = time.monotonic()
+
+        if self.pool:
+            return self._execute_persistent(prompt, started)
 
         # Run command
         try:
@@ -150,18 +677,69 @@ class ToolExecutor(Executor):
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=60
+                timeout=self.timeout
             )
-
-            if result.returncode == 0:
-                return result.stdout.strip()
-            else:
-                return f"Error: {result.stderr}"
-
         except subprocess.TimeoutExpired:
-            return "Error: Command timed out"
+            return _timed_out("Error: Command timed out", started)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+
+        return self._from_exit(result.returncode, result.stdout, result.stderr, started)
+
+    def _from_exit(self, returncode: Optional[int], stdout: str, stderr: str, started: float) -> ExecutionResult:
+        latency = time.monotonic() - started
+        if returncode == 0:
+            return ExecutionResult(ExecutionResult.SUCCESS, output=stdout.strip(), latency=latency)
+        return ExecutionResult(
+            ExecutionResult.ERROR,
+            output=f"Error: {stderr}",
+            error=stderr.strip() or f"exit status {returncode}",
+            latency=latency,
+        )
+
+    def _execute_persistent(self, prompt: str, started: float) -> ExecutionResult:
+        """Execute a task on a persistent worker."""
+        try:
+            line = self.pool.submit(prompt, self.timeout)
+        except queue.Empty:
+            return _timed_out("Error: Command timed out", started)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+
+        latency = time.monotonic() - started
+        try:
+            reply = json.loads(line)
+        except json.JSONDecodeError:
+            reply = None
+        if isinstance(reply, dict):
+            if reply.get("error"):
+                return ExecutionResult(
+                    ExecutionResult.ERROR, output=f"Error: {reply['error']}", error=str(reply["error"]), latency=latency
+                )
+            if "result" in reply:
+                return ExecutionResult(ExecutionResult.SUCCESS, output=str(reply["result"]).strip(), latency=latency)
+        return ExecutionResult(ExecutionResult.SUCCESS, output=line.strip(), latency=latency)
+
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        """Execute task using external tool, without blocking a thread."""
+        return (await self.run_async(task, context)).output
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        if self.pool:
+            # Round trips to a persistent worker are short; use a thread
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.run, task, context)
+
+        started = time.monotonic()
+        cmd = [self.command] + self.args + [self._build_prompt(task)]
+        try:
+            result = await self.runner.run(cmd, timeout=self.timeout)
         except Exception as e:
-            return f"Error: {str(e)}"
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+
+        if result.timed_out:
+            return _timed_out("Error: Command timed out", started)
+        return self._from_exit(result.returncode, result.stdout, result.stderr, started)
 
     def _build_prompt(self, task: Any) -> str:
         """Build prompt from task."""
@@ -176,18 +754,78 @@ class ToolExecutor(Executor):
 class AIClaudeCodeExecutor(Executor):
     """Execute tasks using Claude Code (if installed)."""
 
-    def __init__(self, claude_path: Optional[str] = None):
+    def __init__(
+        self,
+        claude_path: Optional[str] = None,
+        timeout: float = 120,
+        runner: Optional[SubprocessRunner] = None
+    ):
         """
         Initialize Claude Code executor.
 
         Args:
             claude_path: Path to Claude Code executable
+            timeout: Seconds before Claude Code is killed
+            runner: Subprocess runner for execute_async (default: shared)
         """
         self.claude_path = claude_path or "claude"
+        self.timeout = timeout
+        self.runner = runner or default_runner
 
     def execute(self, task: Any, context: Optional[Dict] = None) -> str:
         """Execute task using Claude Code."""
-        prompt = f"""
+        return self.run(task, context).output
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Execute task; the outcome comes from Claude Code's exit status."""
+        prompt = self._build_prompt(task)
+        started = time.monotonic()
+
+        try:
+            result = subprocess.run(
+                [self.claude_path, prompt],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except FileNotFoundError:
+            return _not_found(started)
+        except subprocess.TimeoutExpired:
+            return _timed_out("Error: Claude Code timed out", started)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+
+        return self._from_exit(result.returncode, result.stdout, result.stderr, started)
+
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        """Execute task using Claude Code, without blocking a thread."""
+        return (await self.run_async(task, context)).output
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        started = time.monotonic()
+        try:
+            result = await self.runner.run([self.claude_path, self._build_prompt(task)], timeout=self.timeout)
+        except FileNotFoundError:
+            return _not_found(started)
+        except Exception as e:
+            return ExecutionResult.from_exception(e, time.monotonic() - started)
+
+        if result.timed_out:
+            return _timed_out("Error: Claude Code timed out", started)
+        return self._from_exit(result.returncode, result.stdout, result.stderr, started)
+
+    def _from_exit(self, returncode: Optional[int], stdout: str, stderr: str, started: float) -> ExecutionResult:
+        latency = time.monotonic() - started
+        output = stdout.strip() or stderr.strip()
+        if returncode == 0:
+            return ExecutionResult(ExecutionResult.SUCCESS, output=output, latency=latency)
+        return ExecutionResult(
+            ExecutionResult.ERROR, output=output, error=stderr.strip() or f"exit status {returncode}", latency=latency
+        )
+
+    def _build_prompt(self, task: Any) -> str:
+        """Build prompt from task."""
+        return f"""
 Task: {task.title}
 
 Description:
@@ -199,22 +837,139 @@ Requirements:
 Please complete this task.
 """
 
-        try:
-            result = subprocess.run(
-                [self.claude_path, prompt],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
 
-            return result.stdout.strip() or result.stderr.strip()
+class ProviderClients:
+    """Shared, lazily created AI provider clients.
 
-        except FileNotFoundError:
-            return "Claude Code not found. Please install or provide correct path."
-        except subprocess.TimeoutExpired:
-            return "Error: Claude Code timed out"
-        except Exception as e:
-            return f"Error: {str(e)}"
+    SDK clients (``openai.OpenAI``, ``anthropic.Anthropic``) and the Ollama
+    HTTP session are created once per (provider, api_key, base_url) and
+    reused, so every task shares their keep-alive connection pools. They
+    are safe to share across threads. Put an instance in the executor
+    ``context`` under ``"clients"`` to share it between executors.
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self.pool_size = pool_size
+        self._clients: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> Any:
+        """Get (or create) the client for a provider."""
+        key = (provider, api_key, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = self._create(provider, api_key, base_url)
+        return client
+
+    def _create(self, provider: str, api_key: Optional[str], base_url: Optional[str]) -> Any:
+        kwargs = {"base_url": base_url} if base_url else {}
+        if provider == "openai":
+            import openai
+            return openai.OpenAI(api_key=api_key, **kwargs)
+        if provider == "anthropic":
+            from anthropic import Anthropic
+            return Anthropic(api_key=api_key, **kwargs)
+        if provider == "ollama":
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            return session
+        raise ValueError(f"Unknown provider '{provider}'")
+
+    def close(self):
+        """Close every client and its connections."""
+        with self._lock:
+            for client in self._clients.values():
+                close = getattr(client, "close", None)
+                if close:
+                    try:
+                        close()
+                    except Exception:
+                        pass
+            self._clients.clear()
+
+
+# Shared by executors that aren't given their own clients
+shared_clients = ProviderClients()
+
+
+class OllamaScheduler:
+    """Queues requests to a local Ollama server.
+
+    Ollama generates one request per loaded model at a time unless the
+    server runs with ``OLLAMA_NUM_PARALLEL``; extra requests just wait
+    server-side and compete for the model. The scheduler admits at most
+    ``parallel`` requests (set it to the server's setting) in FIFO order
+    and adds ``keep_alive`` to each request so the model stays loaded
+    between tasks. Time spent waiting for a slot and time spent
+    generating are tracked separately. Share one scheduler between all
+    executors that use the same server.
+    """
+
+    def __init__(self, parallel: int = 1, keep_alive: str = "30m"):
+        self.parallel = parallel
+        self.keep_alive = keep_alive
+        self._cond = threading.Condition()
+        self._waiting: "deque[object]" = deque()
+        self._running = 0
+        self.completed = 0
+        self.wait_time = 0.0
+        self.generate_time = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold a generation slot for the duration of the block."""
+        ticket = object()
+        queued_at = time.monotonic()
+        with self._cond:
+            self._waiting.append(ticket)
+            while self._waiting[0] is not ticket or self._running >= self.parallel:
+                self._cond.wait()
+            self._waiting.popleft()
+            self._running += 1
+            self._cond.notify_all()
+        started = time.monotonic()
+        wait = started - queued_at
+        try:
+            yield
+        finally:
+            generated = time.monotonic() - started
+            with self._cond:
+                self._running -= 1
+                self.completed += 1
+                self.wait_time += wait
+                self.generate_time += generated
+                self.max_wait = max(self.max_wait, wait)
+                self._cond.notify_all()
+            logger.debug(f"Ollama request waited {wait:.2f}s, generated for {generated:.2f}s")
+
+    def preload(self, session: Any, url: str, model: str):
+        """Load ``model`` into memory (a generate request with no prompt)."""
+        session.post(
+            f"{url}/api/generate",
+            json={"model": model, "keep_alive": self.keep_alive},
+            timeout=120
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            done = self.completed or 1
+            return {
+                "parallel": self.parallel,
+                "running": self._running,
+                "queued": len(self._waiting),
+                "completed": self.completed,
+                "avg_wait": self.wait_time / done,
+                "max_wait": self.max_wait,
+                "avg_generate": self.generate_time / done,
+            }
 
 
 class AIModelExecutor(Executor):
@@ -224,7 +979,12 @@ class AIModelExecutor(Executor):
         self,
         provider: str = "openai",
         api_key: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        clients: Optional[ProviderClients] = None,
+        cache: Optional[LLMResponseCache] = None,
+        scheduler: Optional[OllamaScheduler] = None,
+        budget: Optional[BudgetManager] = None
     ):
         """
         Initialize AI model executor.
@@ -233,30 +993,158 @@ class AIModelExecutor(Executor):
             provider: 'openai', 'anthropic', or 'ollama'
             api_key: API key for the provider
             model: Model name (e.g., 'gpt-4', 'claude-3-sonnet')
+            base_url: Provider endpoint override (Ollama: http://localhost:11434)
+            clients: Provider clients to reuse (default: shared across executors)
+            cache: Completion cache; identical prompts are answered from it
+            scheduler: Ollama request scheduler (queueing and keep-alive)
+            budget: Rate and cost limits; requests wait for budget before sending
         """
         self.provider = provider
         self.api_key = api_key
         self.model = model
-        self._client = None
+        self.base_url = base_url
+        self.clients = clients or shared_clients
+        self.cache = cache
+        self.scheduler = scheduler
+        self.budget = budget
+        self.max_tokens = 1000
+
+    def _client(self, context: Optional[Dict] = None) -> Any:
+        """Provider client, taken from context["clients"] when present."""
+        clients = (context or {}).get("clients") or self.clients
+        return clients.get(self.provider, self.api_key, self.base_url)
+
+    def prewarm(self, context: Optional[Dict] = None):
+        """Create the provider client and open a connection ahead of the first task."""
+        try:
+            client = self._client(context)
+            if self.provider == "ollama" and self.scheduler:
+                self.scheduler.preload(client, self._ollama_url(), self.model or "llama2")
+            elif self.provider == "ollama":
+                client.get(f"{self._ollama_url()}/api/tags", timeout=5)
+            else:
+                client.models.list()
+        except Exception:
+            pass  # best effort; the first task will connect instead
 
     def execute(self, task: Any, context: Optional[Dict] = None) -> str:
         """Execute task using AI model."""
+        return self.run(task, context).output
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Execute task and report token usage along with the outcome."""
+        started = time.monotonic()
+        result = self._run(task, context)
+        result.latency = time.monotonic() - started
+        return result
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.run, task, context)
+
+    def _run(self, task: Any, context: Optional[Dict]) -> ExecutionResult:
         if not self.api_key:
-            return "Error: No API key provided. Set AI_API_KEY environment variable."
+            return _failed("Error: No API key provided. Set AI_API_KEY environment variable.")
+
+        calls = {
+            "openai": self._execute_openai,
+            "anthropic": self._execute_anthropic,
+            "ollama": self._execute_ollama,
+        }
+        if self.provider not in calls:
+            return _failed(f"Error: Unknown provider '{self.provider}'")
 
         prompt = self._build_prompt(task)
 
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.provider, self.model, prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return ExecutionResult(ExecutionResult.SUCCESS, output=cached)
+
         try:
-            if self.provider == "openai":
-                return self._execute_openai(prompt)
-            elif self.provider == "anthropic":
-                return self._execute_anthropic(prompt)
-            elif self.provider == "ollama":
-                return self._execute_ollama(prompt)
-            else:
-                return f"Error: Unknown provider '{self.provider}'"
+            reservation = self._reserve(task, prompt)
+        except BudgetExceededError as e:
+            return _failed(f"Error: {str(e)}")
+
+        usage: Dict[str, int] = {}
+        try:
+            output = calls[self.provider](prompt, context, usage)
+        except ImportError:
+            return _failed(MISSING_PACKAGE[self.provider])
         except Exception as e:
-            return f"Error: {str(e)}"
+            result = ExecutionResult.from_exception(e)
+            result.output = f"{PROVIDER_NAMES[self.provider]} Error: {str(e)}"
+            return result
+        finally:
+            if reservation is not None:
+                self.budget.settle(reservation, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+        if key is not None and output:
+            self.cache.put(key, output)
+        return ExecutionResult(
+            ExecutionResult.SUCCESS,
+            output=output,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+
+    def _reserve(self, task: Any, prompt: str):
+        """Wait for budget for one request, queued under the task's first skill."""
+        if self.budget is None:
+            return None
+        skills = getattr(task, "skills", None)
+        skill = skills[0] if skills else getattr(task, "type", "default")
+        return self.budget.acquire(self.provider, estimate_tokens(prompt), self.max_tokens, skill=skill)
+
+    def stream(
+        self, task: Any, context: Optional[Dict] = None, cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """Yield completion text as the provider generates it.
+
+        Stops when ``cancel`` is set or the generator is closed, closing
+        the provider stream. Errors are raised rather than returned as
+        strings, since part of the output may already have been yielded.
+        Only complete responses are cached.
+        """
+        if not self.api_key:
+            raise ValueError("No API key provided. Set AI_API_KEY environment variable.")
+
+        prompt = self._build_prompt(task)
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.provider, self.model, prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        if self.provider == "openai":
+            source = self._stream_openai(prompt, context)
+        elif self.provider == "anthropic":
+            source = self._stream_anthropic(prompt, context)
+        elif self.provider == "ollama":
+            source = self._stream_ollama(prompt, context)
+        else:
+            raise ValueError(f"Unknown provider '{self.provider}'")
+
+        reservation = self._reserve(task, prompt)
+        chunks = []
+        try:
+            for chunk in source:
+                if cancel is not None and cancel.is_set():
+                    return
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            source.close()
+            if reservation is not None:
+                self.budget.settle(reservation, reservation.prompt_tokens, estimate_tokens("".join(chunks)))
+
+        if key is not None and chunks:
+            self.cache.put(key, "".join(chunks))
 
     def _build_prompt(self, task: Any) -> str:
         """Build prompt from task."""
@@ -268,65 +1156,201 @@ Requirements: {', '.join(task.requirements)}
 
 Provide your response:"""
 
-    def _execute_openai(self, prompt: str) -> str:
+    def _ollama_url(self) -> str:
+        return (self.base_url or "http://localhost:11434").rstrip("/")
+
+    def _execute_openai(
+        self, prompt: str, context: Optional[Dict] = None, usage: Optional[Dict[str, int]] = None
+    ) -> str:
         """Execute using OpenAI API."""
-        try:
-            import openai
-            client = openai.OpenAI(api_key=self.api_key)
+        client = self._client(context)
 
-            response = client.chat.completions.create(
-                model=self.model or "gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000
-            )
+        response = client.chat.completions.create(
+            model=self.model or "gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.max_tokens
+        )
 
-            return response.choices[0].message.content
+        if usage is not None and getattr(response, "usage", None):
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
 
-        except ImportError:
-            return "Error: openai package not installed. Run: pip install openai"
-        except Exception as e:
-            return f"OpenAI Error: {str(e)}"
+        return response.choices[0].message.content
 
-    def _execute_anthropic(self, prompt: str) -> str:
+    def _execute_anthropic(
+        self, prompt: str, context: Optional[Dict] = None, usage: Optional[Dict[str, int]] = None
+    ) -> str:
         """Execute using Anthropic API."""
-        try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=self.api_key)
+        client = self._client(context)
 
-            response = client.messages.create(
-                model=self.model or "claude-3-sonnet-20240229",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+        response = client.messages.create(
+            model=self.model or "claude-3-sonnet-20240229",
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
 
-            return response.content[0].text
+        if usage is not None and getattr(response, "usage", None):
+            usage["prompt_tokens"] = response.usage.input_tokens
+            usage["completion_tokens"] = response.usage.output_tokens
 
-        except ImportError:
-            return "Error: anthropic package not installed. Run: pip install anthropic"
-        except Exception as e:
-            return f"Anthropic Error: {str(e)}"
+        return response.content[0].text
 
-    def _execute_ollama(self, prompt: str) -> str:
+    def _execute_ollama(
+        self, prompt: str, context: Optional[Dict] = None, usage: Optional[Dict[str, int]] = None
+    ) -> str:
         """Execute using local Ollama model."""
-        try:
-            import requests
+        session = self._client(context)
 
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": self.model or "llama2",
-                    "prompt": prompt,
-                    "stream": False
-                },
+        with self._ollama_slot():
+            response = session.post(
+                f"{self._ollama_url()}/api/generate",
+                json=self._ollama_payload(prompt, stream=False),
                 timeout=60
             )
 
-            return response.json().get("response", "No response")
+        data = response.json()
+        if usage is not None and "eval_count" in data:
+            usage["prompt_tokens"] = data.get("prompt_eval_count", 0)
+            usage["completion_tokens"] = data["eval_count"]
+
+        return data.get("response", "No response")
+
+    def _stream_openai(self, prompt: str, context: Optional[Dict] = None) -> Iterator[str]:
+        client = self._client(context)
+        response = client.chat.completions.create(
+            model=self.model or "gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        try:
+            for event in response:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            response.close()
+
+    def _stream_anthropic(self, prompt: str, context: Optional[Dict] = None) -> Iterator[str]:
+        client = self._client(context)
+        with client.messages.stream(
+            model=self.model or "claude-3-sonnet-20240229",
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        ) as response:
+            for text in response.text_stream:
+                yield text
+
+    def _stream_ollama(self, prompt: str, context: Optional[Dict] = None) -> Iterator[str]:
+        session = self._client(context)
+        with self._ollama_slot():
+            response = session.post(
+                f"{self._ollama_url()}/api/generate",
+                json=self._ollama_payload(prompt, stream=True),
+                timeout=60,
+                stream=True
+            )
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise RuntimeError(f"Ollama Error: {data['error']}")
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
+            finally:
+                response.close()
+
+    def _ollama_payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        payload = {"model": self.model or "llama2", "prompt": prompt, "stream": stream}
+        if self.scheduler:
+            payload["keep_alive"] = self.scheduler.keep_alive
+        return payload
+
+    @contextmanager
+    def _ollama_slot(self):
+        if self.scheduler is None:
+            yield
+        else:
+            with self.scheduler.slot():
+                yield
 
-        except ImportError:
-            return "Error: requests package not installed"
-        except Exception as e:
-            return f"Ollama Error: {str(e)}"
+
+def is_valid_result(result: Any) -> bool:
+    """Default result check: a non-empty string (failures are judged by run() status)."""
+    return isinstance(result, str) and bool(result.strip())
+
+
+class StrategyStats:
+    """Win/latency/health record for one HybridExecutor strategy.
+
+    Health is the success rate over the last ``window`` attempts,
+    smoothed towards 1 so a new backend starts out healthy.
+    """
+
+    def __init__(self, window: int = 200):
+        self.attempts = 0
+        self.wins = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.skipped = 0
+        self.tokens = 0
+        self.latencies: "deque[float]" = deque(maxlen=window)
+        self.outcomes: "deque[bool]" = deque(maxlen=window)
+
+    def record(self, result: ExecutionResult, ok: bool):
+        self.latencies.append(result.latency)
+        self.outcomes.append(ok)
+        self.tokens += result.tokens or 0
+        if ok:
+            self.wins += 1
+        else:
+            self.failures += 1
+            if result.status == ExecutionResult.TIMEOUT:
+                self.timeouts += 1
+
+    def health(self) -> float:
+        """Smoothed recent success rate in [0, 1]."""
+        return (sum(self.outcomes) + 1) / (len(self.outcomes) + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency quantile of recent completed attempts."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "wins": self.wins,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "skipped": self.skipped,
+            "tokens": self.tokens,
+            "health": self.health(),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class _HandlerExecutor(Executor):
+    """Adapts a custom ``handler(task, context)`` function to Executor."""
+
+    def __init__(self, handler: Callable):
+        self.handler = handler
+
+    def execute(self, task: Any, context: Optional[Dict] = None) -> str:
+        return self.handler(task, context)
+
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        if asyncio.iscoroutinefunction(self.handler):
+            return await self.handler(task, context)
+        return await super().execute_async(task, context)
 
 
 class HybridExecutor(Executor):
@@ -338,13 +1362,36 @@ class HybridExecutor(Executor):
     2. AI model (if configured)
     3. External tool (if configured)
     4. Rule-based fallback
+
+    A strategy that errors, times out or returns a result ``validator``
+    rejects passes the task to the next. Each strategy except the
+    fallback has a circuit breaker: after ``breaker_threshold``
+    consecutive failures it is skipped without being called, and after
+    ``breaker_reset_timeout`` seconds one task probes it again. Strategies
+    whose health score drops below ``min_health`` are tried after the
+    healthy ones.
+
+    With ``hedge_delay`` set, strategies race instead: the first starts
+    at once and each next one starts ``hedge_delay`` seconds after the
+    previous (or immediately when it fails). The first valid result wins
+    and the others are cancelled. With ``hedge_quantile`` (e.g. 0.95) the
+    delay becomes that quantile of the running strategy's recent latency
+    once it has ``min_samples`` of them. Executors running in a worker
+    thread can't be interrupted; their late results are discarded.
     """
 
     def __init__(
         self,
         ai_executor: Optional[Executor] = None,
         tool_executor: Optional[Executor] = None,
-        fallback: Optional[Executor] = None
+        fallback: Optional[Executor] = None,
+        hedge_delay: Optional[float] = None,
+        hedge_quantile: Optional[float] = None,
+        min_samples: int = 20,
+        validator: Callable[[Any], bool] = is_valid_result,
+        breaker_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        min_health: float = 0.5
     ):
         """
         Initialize hybrid executor.
@@ -353,40 +1400,205 @@ class HybridExecutor(Executor):
             ai_executor: AI model executor
             tool_executor: External tool executor
             fallback: Fallback rule-based executor
+            hedge_delay: Seconds before starting the next strategy; enables racing
+            hedge_quantile: Latency quantile used as the hedge delay once known
+            min_samples: Latency samples needed before hedge_quantile applies
+            validator: Returns True for results that may be delivered
+            breaker_threshold: Consecutive failures before a strategy is skipped
+            breaker_reset_timeout: Seconds before a skipped strategy is probed
+            min_health: Health score below which a strategy is tried last
         """
         self.ai_executor = ai_executor
         self.tool_executor = tool_executor
         self.fallback = fallback or RuleBasedExecutor()
         self.custom_handlers = {}
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.validator = validator
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.min_health = min_health
+        self.strategy_stats: Dict[str, StrategyStats] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._race_pool: Optional[ThreadPoolExecutor] = None
 
     def register_handler(self, task_type: str, handler):
         """Register a custom handler for a task type."""
         self.custom_handlers[task_type] = handler
 
-    def execute(self, task: Any, context: Optional[Dict] = None) -> str:
-        """Execute using available strategies."""
+    def _strategies(self, task: Any) -> List[Tuple[str, Executor]]:
         task_type = getattr(task, 'type', 'unknown')
-
-        # Try custom handler first
+        strategies = []
         if task_type in self.custom_handlers:
-            try:
-                return self.custom_handlers[task_type](task, context)
-            except:
-                pass  # Fall through to other strategies
-
-        # Try AI executor
+            strategies.append(("custom", _HandlerExecutor(self.custom_handlers[task_type])))
         if self.ai_executor:
-            try:
-                return self.ai_executor.execute(task, context)
-            except:
-                pass  # Fall through
-
-        # Try tool executor
+            strategies.append(("ai", self.ai_executor))
         if self.tool_executor:
-            try:
-                return self.tool_executor.execute(task, context)
-            except:
-                pass  # Fall through
+            strategies.append(("tool", self.tool_executor))
+        # Sick backends go last (stable sort keeps the configured order otherwise)
+        strategies.sort(key=lambda item: self._stats(item[0]).health() < self.min_health)
+        strategies.append(("fallback", self.fallback))
+        return strategies
+
+    def _stats(self, name: str) -> StrategyStats:
+        if name not in self.strategy_stats:
+            self.strategy_stats[name] = StrategyStats()
+        return self.strategy_stats[name]
+
+    def _breaker(self, name: str) -> CircuitBreaker:
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(
+                name=f"executor:{name}",
+                failure_threshold=self.breaker_threshold,
+                reset_timeout=self.breaker_reset_timeout,
+            )
+        return self.breakers[name]
+
+    def _admit(self, name: str) -> bool:
+        """Whether to call a strategy now (the fallback is always called)."""
+        if name == "fallback" or self._breaker(name).allow():
+            self._stats(name).attempts += 1
+            return True
+        self._stats(name).skipped += 1
+        return False
+
+    def _record(self, name: str, task: Any, result: ExecutionResult) -> bool:
+        """Record a finished attempt; True if its result is usable."""
+        result.backend = name
+        ok = result.ok and self.validator(result.output)
+        self._stats(name).record(result, ok)
+        if name != "fallback":
+            if ok:
+                self._breaker(name).record_success()
+            else:
+                self._breaker(name).record_failure()
+        if not ok:
+            reason = result.error or result.output[:100]
+            logger.warning(f"{name} strategy failed for task {getattr(task, 'job_id', '?')}: {reason}")
+        return ok
+
+    def _hedge_after(self, name: str) -> float:
+        if self.hedge_quantile is not None:
+            stats = self._stats(name)
+            if len(stats.latencies) >= self.min_samples:
+                return stats.quantile(self.hedge_quantile)
+        return self.hedge_delay or 0.0
 
-        # Fall back to rule-based
-        return self.fallback.execute(task, context)
+    def execute(self, task: Any, context: Optional[Dict] = None) -> str:
+        """Execute using available strategies."""
+        return self.run(task, context).output
+
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        """Execute using available strategies, racing them if hedging is enabled."""
+        return (await self.run_async(task, context)).output
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Execute and return the winning strategy's result (``backend`` names it)."""
+        if self.hedge_delay is not None:
+            return self._race(task, context)
+
+        result = None
+        for name, executor in self._strategies(task):
+            if not self._admit(name):
+                continue
+            result = executor.run(task, context)
+            if self._record(name, task, result):
+                return result
+        # Every strategy failed: report the fallback's answer as is
+        return result
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        if self.hedge_delay is None:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.run, task, context)
+
+        remaining = self._strategies(task)
+        pending: Dict[asyncio.Future, str] = {}
+        result: Optional[ExecutionResult] = None
+        next_hedge = 0.0
+
+        def launch():
+            nonlocal next_hedge
+            while remaining:
+                name, executor = remaining.pop(0)
+                if self._admit(name):
+                    pending[asyncio.ensure_future(executor.run_async(task, context))] = name
+                    next_hedge = time.monotonic() + self._hedge_after(name)
+                    return
+
+        launch()
+        try:
+            while pending:
+                timeout = max(0.0, next_hedge - time.monotonic()) if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                for future in done:
+                    name = pending.pop(future)
+                    result = future.result()
+                    if self._record(name, task, result):
+                        return result
+                    launch()
+        finally:
+            self._abandon(pending)
+        return result
+
+    def _race(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Hedged race for synchronous callers.
+
+        Strategies run on a private thread pool and the winner is returned
+        without waiting for the losers, which finish in the background.
+        """
+        if self._race_pool is None:
+            self._race_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="moltswarm-hedge")
+
+        remaining = self._strategies(task)
+        pending: Dict[Any, str] = {}
+        result: Optional[ExecutionResult] = None
+        next_hedge = 0.0
+
+        def launch():
+            nonlocal next_hedge
+            while remaining:
+                name, executor = remaining.pop(0)
+                if self._admit(name):
+                    pending[self._race_pool.submit(executor.run, task, context)] = name
+                    next_hedge = time.monotonic() + self._hedge_after(name)
+                    return
+
+        launch()
+        try:
+            while pending:
+                timeout = max(0.0, next_hedge - time.monotonic()) if remaining else None
+                done, _ = wait_futures(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                for future in done:
+                    name = pending.pop(future)
+                    result = future.result()
+                    if self._record(name, task, result):
+                        return result
+                    launch()
+        finally:
+            self._abandon(pending)
+        return result
+
+    def _abandon(self, pending: Dict[Any, str]):
+        """Cancel racers that lost; free any breaker probe slot they held."""
+        for future, name in pending.items():
+            future.cancel()
+            self._stats(name).cancelled += 1
+            if name in self.breakers:
+                self.breakers[name].release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-strategy outcomes, health, latency and breaker state."""
+        stats = {}
+        for name, strategy in self.strategy_stats.items():
+            stats[name] = strategy.as_dict()
+            if name in self.breakers:
+                stats[name]["breaker"] = self.breakers[name].state
+        return stats
@@ -1,14 +1,21 @@
 """SwarmNode: The main AI worker node for MoltSwarm."""
 
 import asyncio
+import functools
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any, Callable
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
-from moltswarm.client import MoltbookClient
-from moltswarm.protocols import Task, TaskDelivery, find_existing_claim, is_claim_expired
+from moltswarm.client import MoltbookClient, new_idempotency_key
+from moltswarm.executors import shared_clients
+from moltswarm.protocols import Task, TaskDelivery, ClaimIndex, JobClaimState, server_clock
 from moltswarm.skills import SkillRegistry
+from moltswarm.sources import BackfillSource, FeedSource, SubscriptionPlanner, TaskSource
+from moltswarm.seen import SeenSet
+from moltswarm.timers import Timer, TimerQueue
 from moltswarm.config import SwarmConfig
 
 
@@ -33,6 +40,11 @@ class SwarmNode:
         description: str = "",
         heartbeat_interval: int = 14400,
         auto_claim: bool = True,
+        client: Optional[MoltbookClient] = None,
+        max_concurrency: int = 1,
+        seen: Optional[SeenSet] = None,
+        max_tracked_posts: int = 10000,
+        max_queued: int = 1000,
     ):
         self.name = name
         self.skills = [s.lstrip("#") for s in skills]
@@ -40,23 +52,69 @@ class SwarmNode:
         self.heartbeat_interval = heartbeat_interval
         self.auto_claim = auto_claim
 
-        self.client = MoltbookClient(api_key=api_key)
+        self.max_concurrency = max_concurrency
+        self.client = client or MoltbookClient(api_key=api_key, concurrency=max_concurrency)
         self.registry = SkillRegistry()
 
         self._running = False
-        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        # Resources handlers pass to executors as ``context``
+        self.context: Dict[str, Any] = {"clients": shared_clients}
+        self._prewarm: List[Any] = []
+        # Delivered jobs (Bloom filter) and compact per-post claim indexes (LRU)
+        self.seen = seen or SeenSet()
+        self.max_tracked_posts = max_tracked_posts
+        self._claim_indexes: "OrderedDict[str, ClaimIndex]" = OrderedDict()
+        self._claims_lock = threading.Lock()  # claims are refreshed from worker threads
+        self.sources: List[TaskSource] = []
+        # Blocking sources poll in worker threads; finished polls wait here
+        self._polls: Dict[TaskSource, "asyncio.Future"] = {}
+        self._polled: Dict[TaskSource, List[Task]] = {}
+        self.subscription_planner: Optional[SubscriptionPlanner] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Pending tasks and their deadline/lease timers (server clock)
+        self.timers = TimerQueue(clock=server_clock.now)
+        self.lease_renewal = 0.8  # renew our claim at this fraction of claim_timeout; None disables
+        self.max_queued = max_queued  # further tasks wait for a later poll
+        self._queue: "OrderedDict[Tuple[str, str], Task]" = OrderedDict()
+        self._queue_timers: Dict[Tuple[str, str], Timer] = {}
+        self._cancelled: Set[Tuple[str, str]] = set()
+        self._cancel_callbacks: List[Callable[[Task], None]] = []
+        self._cancel_events: Dict[Tuple[str, str], threading.Event] = {}
+        self._delivery_callbacks: List[Callable[[Task, bool], None]] = []
+        self._admission_checks: List[Callable[[Task], bool]] = []
+        # Tasks being processed; at most max_concurrency at once
+        self._inflight: Set["asyncio.Future"] = set()
+        self._running_keys: Set[Tuple[str, str]] = set()
 
     @classmethod
     def from_config(cls, config: SwarmConfig) -> "SwarmNode":
         """Create a node from configuration."""
-        return cls(
+        node = cls(
             name=config.node.name,
             skills=config.node.skills,
             api_key=config.moltbook.api_key,
             description=config.node.description,
             heartbeat_interval=config.node.heartbeat_interval,
             auto_claim=config.node.auto_claim,
+            client=MoltbookClient.from_config(config.moltbook, concurrency=config.node.max_concurrency),
+            max_concurrency=config.node.max_concurrency,
+            seen=SeenSet(
+                capacity=config.node.seen_capacity,
+                error_rate=config.node.seen_error_rate,
+                rotate_after=config.node.seen_rotate_after,
+                max_bytes=config.node.seen_max_bytes,
+            ),
+            max_tracked_posts=config.node.max_tracked_posts,
+            max_queued=config.node.max_queued,
         )
+        if config.node.plan_subscriptions:
+            node.enable_subscription_planner()
+        if config.node.backfill:
+            node.enable_backfill(max_age=config.node.backfill_max_age)
+        return node
 
     def skill(self, name: str, description: str = "", tags: Optional[List[str]] = None):
         """Decorator to register a skill handler.
@@ -68,26 +126,175 @@ class SwarmNode:
         """
         return self.registry.register(name, description=description, tags=tags)
 
-    def _discover_tasks(self, limit: int = 25) -> List[Task]:
-        """Discover new tasks from the feed."""
-        tasks = []
+    def add_source(self, source: TaskSource) -> TaskSource:
+        """Add a task source. Without any (backfill aside), the node polls the Moltbook feeds."""
+        self.sources.append(source)
+        return source
+
+    def prewarm(self, executor: Any) -> Any:
+        """Have an executor open its provider connections when the node starts.
+
+        Usage:
+            ai = node.prewarm(AIModelExecutor(provider="openai", api_key=key))
+
+            @node.skill("write", tags=["#SKILL_WRITE"])
+            def handle_write(task):
+                return ai.execute(task, node.context)
+        """
+        self._prewarm.append(executor)
+        return executor
 
-        # Get personalized feed
-        feed = self.client.get_personalized_feed(sort="new", limit=limit)
+    def on_cancel(self, callback: Callable[[Task], None]):
+        """Register a callback fired when a running task passes its deadline.
 
-        # Get global feed
-        global_feed = self.client.get_feed(sort="new", limit=limit)
+        Usage:
+            @node.on_cancel
+            def cancelled(task):
+                ...
+        """
+        self._cancel_callbacks.append(callback)
+        return callback
 
-        all_posts = feed + global_feed
+    def on_delivered(self, callback: Callable[[Task, bool], None]):
+        """Register a callback fired after a handler ran, with whether its result was delivered.
 
-        for post in all_posts:
-            task = Task.from_post(post)
-            if task and not task.is_expired():
-                tasks.append(task)
+        Usage:
+            router = ExecutorRouter({"ai": ai, "rules": rules})
+            node.on_delivered(router.record_outcome)
+        """
+        self._delivery_callbacks.append(callback)
+        return callback
 
-        logger.info(f"Discovered {len(tasks)} tasks")
+    def add_admission_check(self, check: Callable[[Task], bool]):
+        """Only claim queued tasks while ``check(task)`` returns True.
+
+        Usage:
+            budget = BudgetManager({"openai": ProviderBudget(rpm=500, daily_cost=5.0)})
+            node.add_admission_check(budget.admits)
+        """
+        self._admission_checks.append(check)
+        return check
+
+    def _admits(self, task: Task) -> bool:
+        for check in self._admission_checks:
+            try:
+                if not check(task):
+                    return False
+            except Exception as e:
+                logger.warning(f"Admission check failed: {e}")
+        return True
+
+    def _notify_delivered(self, task: Task, delivered: bool):
+        for callback in self._delivery_callbacks:
+            try:
+                callback(task, delivered)
+            except Exception as e:
+                logger.warning(f"Delivery callback failed: {e}")
+
+    def cancel_event(self, task: Task) -> threading.Event:
+        """Event set when a running task passes its deadline.
+
+        Pass it to streaming executors so generation stops early:
+            for chunk in ai.stream(task, node.context, cancel=node.cancel_event(task)):
+                ...
+        """
+        key = (task.post_id, task.job_id)
+        if key not in self._cancel_events:
+            self._cancel_events[key] = threading.Event()
+            if key in self._cancelled:
+                self._cancel_events[key].set()
+        return self._cancel_events[key]
+
+    def enable_subscription_planner(self, **kwargs) -> SubscriptionPlanner:
+        """Let the node's feed sources manage submolt subscriptions.
+
+        The planner drives the default FeedSource and any added FeedSource
+        that has no planner of its own. Keyword arguments are passed to
+        SubscriptionPlanner.
+        """
+        kwargs.setdefault("accept", self._can_handle_task)
+        self.subscription_planner = SubscriptionPlanner(self.client, **kwargs)
+        return self.subscription_planner
+
+    def enable_backfill(self, **kwargs) -> BackfillSource:
+        """Add a BackfillSource that only surfaces tasks this node can handle.
+
+        Keyword arguments are passed to BackfillSource (e.g. ``max_age``).
+        """
+        kwargs.setdefault("accept", self._can_handle_task)
+        kwargs.setdefault("claim_state", self._refresh_claims)
+        return self.add_source(BackfillSource(self.client, **kwargs))
+
+    def _add_default_sources(self, interval: float):
+        """Poll the Moltbook feeds unless another source brings fresh jobs.
+
+        Backfill only revisits older posts, so it runs next to the feed.
+        Feed sources without a planner get the node's subscription planner.
+        """
+        if all(isinstance(source, BackfillSource) for source in self.sources):
+            self.add_source(FeedSource(self.client, interval=interval))
+        for source in self.sources:
+            if isinstance(source, FeedSource) and source.planner is None:
+                source.planner = self.subscription_planner
+
+    def _collect_tasks(self) -> List[Task]:
+        """Gather ready tasks from every source, dropping duplicates.
+
+        Blocking sources contribute the tasks of their last finished
+        background poll. Tasks from lower-priority sources (e.g. backfill)
+        come last.
+        """
+        tasks = []
+        seen = set()
+        for source in sorted(self.sources, key=lambda s: s.priority):
+            if source.blocking:
+                ready = self._polled.pop(source, [])
+                self._poll_in_background(source)
+            else:
+                try:
+                    ready = source.poll()
+                except Exception as e:
+                    logger.error(f"Error polling {source.name} source: {e}")
+                    continue
+            for task in ready:
+                key = (task.post_id, task.job_id)
+                if key not in seen:
+                    seen.add(key)
+                    tasks.append(task)
         return tasks
 
+    def _poll_in_background(self, source: TaskSource):
+        """Start polling a blocking source in a worker thread, if it's due."""
+        if source in self._polls or (source.next_poll_in() or 0) > 0:
+            return
+        future = asyncio.get_event_loop().run_in_executor(None, source.poll)
+        self._polls[source] = future
+
+        def finished(done):
+            self._polls.pop(source, None)
+            if done.cancelled():
+                return
+            try:
+                ready = done.result()
+            except Exception as e:
+                logger.error(f"Error polling {source.name} source: {e}")
+                return
+            if ready:
+                self._polled.setdefault(source, []).extend(ready)
+                if self._wakeup is not None:
+                    self._wakeup.set()
+
+        future.add_done_callback(finished)
+
+    async def _wait_for_tasks(self, interval: float):
+        """Sleep until a source is due or a push source notifies us."""
+        due = [s.next_poll_in() for s in self.sources if s not in self._polls]
+        timeout = min([d for d in due if d is not None] + [interval])
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
     def _can_handle_task(self, task: Task) -> bool:
         """Check if this node can handle a task."""
         if not task.matches_skills(self.skills):
@@ -96,19 +303,151 @@ class SwarmNode:
         # Check if we already have a handler registered
         return self.registry.can_handle(task.skills)
 
+    def _claim_index(self, post_id: str) -> ClaimIndex:
+        """Get (or create) a post's claim index, evicting the least recently used."""
+        index = self._claim_indexes.get(post_id)
+        if index is None:
+            index = self._claim_indexes[post_id] = ClaimIndex(compact=True)
+            while len(self._claim_indexes) > self.max_tracked_posts:
+                self._claim_indexes.popitem(last=False)
+        else:
+            self._claim_indexes.move_to_end(post_id)
+        return index
+
+    def _refresh_claims(self, task: Task) -> Optional[JobClaimState]:
+        """Update the post's claim index and return the job's claim state.
+
+        Blocks on the API; the node calls it from a worker thread.
+        """
+        with self._claims_lock:
+            since = self._claim_index(task.post_id).newest
+        comments = self.client.get_comments(task.post_id, since=since)
+        with self._claims_lock:
+            index = self._claim_index(task.post_id)
+            index.update(comments)
+            state = index.get(task.job_id)
+            if state and state.delivered:
+                self.seen.add(f"{task.post_id}:{task.job_id}")
+            return state
+
+    def _is_settled(self, task: Task) -> bool:
+        """Check whether a job is known to be delivered or claimed, without the API.
+
+        The Bloom filter of delivered jobs is checked first and a hit is
+        confirmed against the exact claim index. On a post that is no
+        longer tracked a hit can't be confirmed, so the job is left to
+        _process_task, which settles it with one comment fetch. Misses
+        fall back to the index for live claims (and for deliveries the
+        filter has rotated out).
+        """
+        with self._claims_lock:
+            index = self._claim_indexes.get(task.post_id)
+            state = index.get(task.job_id) if index else None
+            if f"{task.post_id}:{task.job_id}" in self.seen and state is not None and state.delivered:
+                return True
+            if state is None:
+                return False
+            return state.delivered or state.is_claimed(task.claim_timeout)
+
+    def _enqueue(self, task: Task) -> bool:
+        """Queue a task and schedule its eviction at the deadline."""
+        key = (task.post_id, task.job_id)
+        if key in self._queue or key in self._running_keys or task.is_expired():
+            return False
+        if len(self._queue) >= self.max_queued:
+            logger.debug(f"Queue full, leaving task {task.job_id} for a later poll")
+            return False
+        self._queue[key] = task
+        if task.deadline_at is not None:
+            self._queue_timers[key] = self.timers.schedule(task.deadline_at, self._evict, key)
+        return True
+
+    def _evict(self, key: Tuple[str, str]):
+        task = self._queue.pop(key, None)
+        self._queue_timers.pop(key, None)
+        if task:
+            logger.info(f"Task {task.job_id} expired while queued")
+
+    def _dequeue(self, key: Optional[Tuple[str, str]] = None) -> Optional[Task]:
+        """Take a task off the queue: the oldest, or the one with ``key``."""
+        self.timers.run_due()
+        if not self._queue:
+            return None
+        if key is None:
+            key = next(iter(self._queue))
+        task = self._queue.pop(key, None)
+        self.timers.cancel(self._queue_timers.pop(key, None))
+        return task
+
+    def _schedule_lease(self, task: Task) -> List[Timer]:
+        """Schedule claim renewal and deadline cancellation for a running task."""
+        timers = []
+        if self.lease_renewal:
+            delay = task.claim_timeout * self.lease_renewal
+            timers.append(self.timers.schedule_in(delay, self._renew_lease, task, timers))
+        if task.deadline_at is not None:
+            timers.append(self.timers.schedule(task.deadline_at, self._cancel_task, task))
+        return timers
+
+    def _renew_lease(self, task: Task, timers: List[Timer]):
+        """Post a fresh claim so other nodes keep treating the job as taken."""
+        claim = TaskDelivery(job_id=task.job_id, status="CLAIMING", delivered_at=datetime.now().isoformat())
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(
+            None,
+            lambda: self.client.add_comment(task.post_id, claim.to_comment(), idempotency_key=new_idempotency_key()),
+        )
+
+        def posted(done):
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None:
+                logger.warning(f"Failed to renew claim on task {task.job_id}: {error}")
+            else:
+                logger.info(f"Renewed claim on task {task.job_id}")
+
+        future.add_done_callback(posted)
+        timers.append(self.timers.schedule_in(task.claim_timeout * self.lease_renewal, self._renew_lease, task, timers))
+
+    def _cancel_task(self, task: Task):
+        self._cancelled.add((task.post_id, task.job_id))
+        event = self._cancel_events.get((task.post_id, task.job_id))
+        if event is not None:
+            event.set()
+        logger.warning(f"Task {task.job_id} passed its deadline while running")
+        for callback in self._cancel_callbacks:
+            try:
+                callback(task)
+            except Exception as e:
+                logger.warning(f"Cancel callback failed: {e}")
+
+    async def _run_timers(self):
+        """Fire due timers while the node runs."""
+        while self._running:
+            self.timers.run_due()
+            delay = self.timers.next_due_in()
+            await asyncio.sleep(1.0 if delay is None else min(delay, 1.0))
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking API call in a worker thread, off the event loop."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
     async def _process_task(self, task: Task) -> bool:
         """Process a single task."""
+        handled = False
         try:
-            # Check for existing claims
-            comments = self.client.get_comments(task.post_id)
-
-            existing_claim = find_existing_claim(comments, task.job_id)
-            if existing_claim:
-                # Check if claim has expired
-                if not is_claim_expired(existing_claim, task.claim_timeout):
+            # Check for existing claims and deliveries
+            state = await self._call(self._refresh_claims, task)
+            if state:
+                if state.delivered:
+                    logger.info(f"Task {task.job_id} already delivered")
+                    return False
+                if state.is_claimed(task.claim_timeout):
                     logger.info(f"Task {task.job_id} already claimed")
                     return False
-                else:
+                if state.last_claim:
                     logger.info(f"Task {task.job_id} claim expired, can re-claim")
 
             # Claim the task
@@ -118,7 +457,9 @@ class SwarmNode:
                 delivered_at=datetime.now().isoformat()
             )
 
-            self.client.add_comment(task.post_id, claim.to_comment())
+            await self._call(
+                self.client.add_comment, task.post_id, claim.to_comment(), idempotency_key=new_idempotency_key()
+            )
             logger.info(f"Claimed task {task.job_id}")
 
             # Find and execute handler
@@ -127,13 +468,30 @@ class SwarmNode:
                 logger.warning(f"No handler found for task {task.job_id}")
                 return False
 
-            # Run handler in thread pool
+            # Run handler in thread pool, keeping our claim alive meanwhile
+            key = (task.post_id, task.job_id)
+            lease_timers = self._schedule_lease(task)
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self._executor,
-                handler,
-                task
-            )
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    result = await handler(task)
+                else:
+                    result = await loop.run_in_executor(
+                        self._executor,
+                        handler,
+                        task
+                    )
+            finally:
+                handled = True
+                for timer in lease_timers:
+                    self.timers.cancel(timer)
+                self._cancel_events.pop(key, None)
+
+            if key in self._cancelled:
+                self._cancelled.discard(key)
+                logger.info(f"Skipping delivery of task {task.job_id}: deadline passed")
+                self._notify_delivered(task, False)
+                return False
 
             # Deliver result
             delivery = TaskDelivery(
@@ -143,45 +501,119 @@ class SwarmNode:
                 delivered_at=datetime.now().isoformat()
             )
 
-            self.client.add_comment(task.post_id, delivery.to_comment())
+            ref = new_idempotency_key()
+            await self._call(self.client.add_comment, task.post_id, delivery.to_comment(), idempotency_key=ref)
             logger.info(f"Delivered task {task.job_id}")
 
+            # Remember the delivery so later polls skip the job; it didn't
+            # come from the server, so it must not move the fetch cursor
+            with self._claims_lock:
+                self.seen.add(f"{task.post_id}:{task.job_id}")
+                self._claim_index(task.post_id).update([{
+                    "id": f"local:{ref}",
+                    "content": delivery.to_comment(),
+                    "created_at": datetime.fromtimestamp(server_clock.now(), timezone.utc).isoformat(),
+                }], advance=False)
+
             # Upvote the post if karma reward is enabled
             if task.reward_karma:
                 try:
-                    self.client.upvote_post(task.post_id)
+                    await self._call(self.client.upvote_post, task.post_id)
                     logger.info(f"Upvoted task {task.job_id}")
                 except Exception as e:
                     logger.warning(f"Failed to upvote: {e}")
 
+            self._notify_delivered(task, True)
             return True
 
         except Exception as e:
             logger.error(f"Error processing task {task.job_id}: {e}")
+            if handled:
+                self._notify_delivered(task, False)
             return False
 
     async def _work_loop(self, interval: int = 60):
         """Main work loop."""
         logger.info(f"Node {self.name} started with skills: {self.skills}")
 
+        self._add_default_sources(interval)
+
+        loop = asyncio.get_event_loop()
+        self._wakeup = asyncio.Event()
+
+        def notify():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+        for source in self.sources:
+            source.start(notify)
+
+        timer_task = asyncio.ensure_future(self._run_timers())
+        try:
+            await self._run_sources(interval)
+        finally:
+            if self._inflight:
+                await asyncio.gather(*self._inflight, return_exceptions=True)
+            timer_task.cancel()
+            for source in self.sources:
+                source.stop()
+
+    def _dispatch(self, task: Task):
+        """Process a task in the background; its slot frees when it finishes."""
+        key = (task.post_id, task.job_id)
+        future = asyncio.ensure_future(self._process_task(task))
+        self._inflight.add(future)
+        self._running_keys.add(key)
+
+        def finished(done):
+            self._inflight.discard(done)
+            self._running_keys.discard(key)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        future.add_done_callback(finished)
+
+    async def _run_sources(self, interval: float):
         while self._running:
+            # Don't poll while the API circuit is open
+            pause = self.client.breaker.retry_after()
+            if pause > 0:
+                logger.warning(f"Moltbook API unavailable, pausing discovery for {pause:.0f}s")
+                await asyncio.sleep(pause)
+                continue
+
             try:
                 # Discover tasks
-                tasks = self._discover_tasks()
+                self._wakeup.clear()
+                tasks = self._collect_tasks()
 
-                # Process tasks we can handle
+                # Queue tasks we can handle
                 for task in tasks:
-                    if not self._running:
-                        break
-
+                    if self._is_settled(task):
+                        continue
                     if self._can_handle_task(task):
                         if self.auto_claim:
-                            await self._process_task(task)
+                            self._enqueue(task)
                         else:
                             logger.info(f"Found task {task.job_id} (auto_claim disabled)")
 
-                # Wait before next check
-                await asyncio.sleep(interval)
+                # Start queued tasks while slots are free. Tasks an admission
+                # check refuses stay queued; expired ones are evicted by their timers
+                self.timers.run_due()
+                deferred = 0
+                for key, task in list(self._queue.items()):
+                    if not self._running or len(self._inflight) >= self.max_concurrency:
+                        break
+                    if not self._admits(task):
+                        deferred += 1
+                        continue
+                    task = self._dequeue(key)
+                    if task is not None:
+                        self._dispatch(task)
+                if deferred:
+                    logger.info(f"Deferring {deferred} queued tasks: admission check refused")
+
+                # Wait for the next source to be due (or a push)
+                await self._wait_for_tasks(interval)
 
             except Exception as e:
                 logger.error(f"Error in work loop: {e}")
@@ -191,6 +623,9 @@ class SwarmNode:
         """Start the node."""
         self._running = True
 
+        for executor in self._prewarm:
+            executor.prewarm(self.context)
+
         # Update profile
         try:
             skills_str = ", ".join(self.registry.get_tags())
@@ -5,11 +5,64 @@ Defines the standard format for tasks and deliveries.
 
 import json
 import re
+import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import cached_property
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, List, Set
 from dataclasses import dataclass, field
 
 
+class ServerClock:
+    """Estimate of the Moltbook server clock.
+
+    Claim and deadline timestamps are written by the server, so comparing
+    them against the local clock goes wrong on skewed machines. The offset
+    (server - local, in seconds) is smoothed from HTTP ``Date`` headers
+    with an exponential moving average.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.offset = 0.0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def observe(self, server_time: float, local_time: Optional[float] = None):
+        """Record one server/local time pair."""
+        local_time = time.time() if local_time is None else local_time
+        sample = server_time - local_time
+        with self._lock:
+            if self.samples == 0:
+                self.offset = sample
+            else:
+                self.offset += self.alpha * (sample - self.offset)
+            self.samples += 1
+
+    def observe_date_header(self, value: Optional[str], local_time: Optional[float] = None):
+        """Record an HTTP Date header (1s resolution, hence the smoothing)."""
+        if not value:
+            return
+        try:
+            server_time = parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return
+        # Date is truncated to the second; assume the middle of that second
+        self.observe(server_time + 0.5, local_time)
+
+    def now(self) -> float:
+        """Current server time estimate, in epoch seconds."""
+        return time.time() + self.offset
+
+    def stats(self) -> Dict[str, Any]:
+        return {"offset_seconds": self.offset, "samples": self.samples}
+
+
+# Shared by the client (which feeds it) and the expiry checks below
+server_clock = ServerClock()
+
+
 @dataclass
 class Task:
     """A swarm task posted to Moltbook."""
@@ -34,6 +87,7 @@ class Task:
     post_id: str = ""
     post_url: str = ""
     author: str = ""
+    submolt: str = ""
 
     @classmethod
     def from_post(cls, post_data: Dict[str, Any]) -> Optional["Task"]:
@@ -74,20 +128,23 @@ class Task:
                 validation=task.get("validation", ""),
                 post_id=post_data.get("id", ""),
                 post_url=f"https://www.moltbook.com/posts/{post_data.get('id', '')}",
-                author=post_data.get("author", {}).get("name", ""),
+                author=(post_data.get("author") or {}).get("name", ""),
+                submolt=_submolt_name(post_data.get("submolt")),
             )
         except (json.JSONDecodeError, KeyError):
             return None
 
-    def is_expired(self) -> bool:
-        """Check if the task has expired."""
-        if not self.deadline:
-            return False
-        try:
-            deadline = datetime.fromisoformat(self.deadline.replace("Z", "+00:00"))
-            return datetime.now(deadline.tzinfo) > deadline
-        except:
+    @cached_property
+    def deadline_at(self) -> Optional[float]:
+        """Deadline as epoch seconds, parsed once (None if absent or invalid)."""
+        return parse_timestamp(self.deadline) if self.deadline else None
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check if the task has expired (against the server clock)."""
+        if self.deadline_at is None:
             return False
+        now = server_clock.now() if now is None else now
+        return now > self.deadline_at
 
     def matches_skills(self, available_skills: List[str]) -> bool:
         """Check if available skills match task requirements."""
@@ -200,32 +257,148 @@ class TaskDelivery:
         return cls(job_id=job_id, status=status, result=comment)
 
 
+def _submolt_name(submolt: Any) -> str:
+    """Submolt name from a post's ``submolt`` field (object or plain name)."""
+    if isinstance(submolt, dict):
+        return submolt.get("name", "") or ""
+    return submolt if isinstance(submolt, str) else ""
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Parse an ISO timestamp from the API into epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (ValueError, AttributeError):
+        return None
+
+
+@dataclass
+class JobClaimState:
+    """Claim and delivery state of a single job, as seen in post comments."""
+
+    job_id: str
+    first_claim: Optional[Dict[str, Any]] = None
+    last_claim: Optional[Dict[str, Any]] = None
+    delivery: Optional[Dict[str, Any]] = None
+    first_claim_at: Optional[float] = None
+    last_claim_at: Optional[float] = None
+    failed_at: Optional[float] = None
+
+    @property
+    def delivered(self) -> bool:
+        """Whether a DELIVERED comment exists for this job."""
+        return self.delivery is not None
+
+    def is_claimed(self, timeout: int, now: Optional[float] = None) -> bool:
+        """Check for a live claim: unexpired and not released by a FAILED."""
+        if self.last_claim is None or self.last_claim_at is None:
+            return False
+        if self.failed_at is not None and self.failed_at >= self.last_claim_at:
+            return False
+        now = server_clock.now() if now is None else now
+        return now - self.last_claim_at <= timeout
+
+    def _add(self, status: str, comment: Dict[str, Any], created_at: Optional[float]):
+        order = created_at if created_at is not None else float("-inf")
+        if status == "CLAIMING":
+            if self.first_claim is None or order < _order(self.first_claim_at):
+                self.first_claim, self.first_claim_at = comment, created_at
+            if self.last_claim is None or order >= _order(self.last_claim_at):
+                self.last_claim, self.last_claim_at = comment, created_at
+        elif status == "DELIVERED":
+            if self.delivery is None:
+                self.delivery = comment
+        elif status == "FAILED":
+            if created_at is not None and order > _order(self.failed_at):
+                self.failed_at = created_at
+
+
+def _order(ts: Optional[float]) -> float:
+    return ts if ts is not None else float("-inf")
+
+
+class ClaimIndex:
+    """Incremental index of claim/delivery comments on one post.
+
+    Each comment is parsed once; calling update() again with an overlapping
+    comment list only processes comments that have not been seen before.
+    ``newest`` holds the latest ``created_at`` seen, for delta fetches.
+
+    With ``compact=True`` (for long-lived indexes fed by delta fetches),
+    claim states keep only each comment's id, author and timestamp, and
+    only the ids at the ``newest`` boundary are remembered for de-duplication.
+    Re-indexing an older comment is harmless: claim state updates are
+    idempotent.
+    """
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        self._seen: Set[Any] = set()
+        self._jobs: Dict[str, JobClaimState] = {}
+        self.newest: Optional[str] = None
+        self._newest_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def update(self, comments: List[Dict[str, Any]], advance: bool = True) -> int:
+        """Index new comments. Returns how many were new.
+
+        Pass ``advance=False`` for comments that didn't come from the server
+        (e.g. a delivery recorded locally), so ``newest`` stays a valid
+        cursor for the next delta fetch.
+        """
+        added = 0
+        for comment in comments:
+            key = comment.get("id") or (comment.get("created_at"), comment.get("content"))
+            if key in self._seen:
+                continue
+            added += 1
+
+            created_at = parse_timestamp(comment.get("created_at", ""))
+            if advance and created_at is not None and created_at > _order(self._newest_at):
+                self.newest, self._newest_at = comment["created_at"], created_at
+                if self.compact:
+                    self._seen.clear()
+            if not self.compact or (advance and created_at is not None and created_at == self._newest_at):
+                self._seen.add(key)
+
+            content = comment.get("content") or ""
+            if not isinstance(content, str) or "job_id" not in content:
+                continue
+            delivery = TaskDelivery.from_comment(content)
+            if not delivery:
+                continue
+
+            state = self._jobs.get(delivery.job_id)
+            if state is None:
+                state = self._jobs[delivery.job_id] = JobClaimState(job_id=delivery.job_id)
+            if self.compact:
+                comment = {k: comment[k] for k in ("id", "author", "created_at") if k in comment}
+            state._add(delivery.status, comment, created_at)
+        return added
+
+    def get(self, job_id: str) -> Optional[JobClaimState]:
+        """Get the indexed state of a job, if any comment mentioned it."""
+        return self._jobs.get(job_id)
+
+
 def find_existing_claim(comments: List[Dict[str, Any]], job_id: str) -> Optional[Dict[str, Any]]:
     """Find if a task has already been claimed.
 
     Returns the most recent claim comment if found.
     """
-    claims = []
-    for comment in comments:
-        content = comment.get("content", "")
-        if f"job_id={job_id}" in content and "**CLAIMING**" in content:
-            claims.append(comment)
-
-    if claims:
-        # Return the most recent claim
-        return max(claims, key=lambda c: c.get("created_at", ""))
-    return None
+    index = ClaimIndex()
+    index.update(comments)
+    state = index.get(job_id)
+    return state.last_claim if state else None
 
 
 def is_claim_expired(comment: Dict[str, Any], timeout: int) -> bool:
     """Check if a claim has expired."""
-    created_at = comment.get("created_at", "")
-    if not created_at:
-        return True
-
-    try:
-        claim_time = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        elapsed = (datetime.now(claim_time.tzinfo) - claim_time).total_seconds()
-        return elapsed > timeout
-    except:
+    claim_time = parse_timestamp(comment.get("created_at", ""))
+    if claim_time is None:
         return True
+    return server_clock.now() - claim_time > timeout
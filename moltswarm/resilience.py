@@ -0,0 +1,138 @@
+"""Retry and circuit breaker primitives for MoltSwarm backends."""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff for retryable failures."""
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+    retry_methods: Tuple[str, ...] = ("GET", "HEAD", "DELETE")
+
+    def should_retry(self, method: str, attempt: int) -> bool:
+        """Whether a failed attempt (0-based) of this method may be retried."""
+        return method.upper() in self.retry_methods and attempt < self.max_retries
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff delay before retry number ``attempt + 1``."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Classic closed / open / half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    refuses calls for ``reset_timeout`` seconds. It then lets a single probe
+    through (half-open); success closes it, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str = "breaker", failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._remaining() <= 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls are being refused."""
+        return self.state == self.OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 if not open)."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._remaining())
+
+    def allow(self) -> bool:
+        """Check whether a call may proceed, claiming the probe slot if half-open."""
+        with self._lock:
+            if self._state == self.OPEN and self._remaining() <= 0:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    self.total_rejected += 1
+                    return False
+                self._probing = True
+                return True
+            if self._state == self.OPEN:
+                self.total_rejected += 1
+                return False
+            return True
+
+    def check(self):
+        """Like allow(), but raise CircuitOpenError when refused."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        """Give back a half-open probe slot whose call ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "times_opened": self.times_opened,
+            }
+
+    def _remaining(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
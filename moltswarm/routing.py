@@ -0,0 +1,258 @@
+"""Adaptive executor routing learned from outcome history."""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from moltswarm.executors import ExecutionResult, Executor
+
+
+logger = logging.getLogger("MoltSwarm")
+
+
+def default_route_key(task: Any) -> str:
+    """Route per task type, falling back to the first requested skill."""
+    task_type = getattr(task, "type", None)
+    if task_type:
+        return task_type
+    skills = getattr(task, "skills", None) or ["unknown"]
+    return skills[0]
+
+
+class ArmStats:
+    """Discounted reward, latency and cost estimates for one backend on one route."""
+
+    def __init__(self):
+        self.pulls = 0.0
+        self.in_flight = 0  # routed, outcome not yet known
+        self.reward = 0.0
+        self.latency: Optional[float] = None
+        self.cost = 0.0
+
+    @property
+    def tried(self) -> float:
+        """Pulls, counting those still waiting for an outcome."""
+        return self.pulls + self.in_flight
+
+    @property
+    def mean(self) -> float:
+        return self.reward / self.pulls if self.pulls else 0.0
+
+    def update(self, reward: float, latency: float, cost: float, decay: float, alpha: float = 0.2):
+        self.pulls = self.pulls * decay + 1
+        self.reward = self.reward * decay + reward
+        self.latency = latency if self.latency is None else (1 - alpha) * self.latency + alpha * latency
+        self.cost = (1 - alpha) * self.cost + alpha * cost
+
+
+@dataclass
+class RoutingDecision:
+    """One routing choice, kept until its outcome is known."""
+
+    key: str
+    backend: str
+    expected_latency: Optional[float]
+    explored: bool
+    result: Optional[ExecutionResult] = None
+
+
+class ExecutorRouter(Executor):
+    """Picks an executor per task with a UCB1 bandit.
+
+    Tasks are grouped by ``route_key`` (task type by default). For each
+    group, every backend is tried once, then the one with the best
+    upper confidence bound on reward is chosen (tasks still waiting for
+    their outcome count as tries); ``exploration`` scales
+    how often less-proven backends are retried. Older observations are
+    discounted by ``decay`` so the router follows backends that change.
+
+    Reward is 1 for a successful, delivered result, plus
+    ``upvote_weight`` per upvote, minus latency and cost penalties
+    (relative to ``latency_target`` seconds and ``cost_target`` dollars).
+    Failed executions score 0 at once. Successful ones wait for
+    ``record_outcome()``, which SwarmNode.on_delivered can call; if no
+    outcome arrives before ``max_pending`` newer decisions, the
+    execution result alone is scored.
+    """
+
+    def __init__(
+        self,
+        executors: Dict[str, Executor],
+        route_key: Callable[[Any], str] = default_route_key,
+        exploration: float = 1.0,
+        decay: float = 0.99,
+        latency_weight: float = 0.3,
+        latency_target: float = 30.0,
+        cost_weight: float = 0.2,
+        cost_target: float = 0.05,
+        cost_per_1k_tokens: Optional[Dict[str, float]] = None,
+        upvote_weight: float = 0.1,
+        max_pending: int = 1000,
+        history_size: int = 1000
+    ):
+        if not executors:
+            raise ValueError("ExecutorRouter needs at least one executor")
+        self.executors = executors
+        self.route_key = route_key
+        self.exploration = exploration
+        self.decay = decay
+        self.latency_weight = latency_weight
+        self.latency_target = latency_target
+        self.cost_weight = cost_weight
+        self.cost_target = cost_target
+        self.cost_per_1k_tokens = cost_per_1k_tokens or {}
+        self.upvote_weight = upvote_weight
+        self.max_pending = max_pending
+
+        self._arms: Dict[Tuple[str, str], ArmStats] = {}
+        self._pending: "OrderedDict[Tuple[str, str], RoutingDecision]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Finished decisions (expected vs actual latency) for analysis
+        self.history: "deque[Dict[str, Any]]" = deque(maxlen=history_size)
+
+    def _arm(self, key: str, backend: str) -> ArmStats:
+        if (key, backend) not in self._arms:
+            self._arms[(key, backend)] = ArmStats()
+        return self._arms[(key, backend)]
+
+    def route(self, task: Any) -> RoutingDecision:
+        """Choose a backend for a task."""
+        key = self.route_key(task)
+        with self._lock:
+            arms = [(name, self._arm(key, name)) for name in self.executors]
+            untried = [name for name, arm in arms if not arm.tried]
+            if untried:
+                backend, explored = untried[0], True
+            else:
+                total = sum(arm.tried for _, arm in arms)
+                scores = {
+                    name: arm.mean + self.exploration * math.sqrt(2 * math.log(total) / arm.tried)
+                    for name, arm in arms
+                }
+                backend = max(scores, key=scores.get)
+                best_mean = max(arm.mean for _, arm in arms)
+                explored = self._arm(key, backend).mean < best_mean
+            arm = self._arm(key, backend)
+            arm.in_flight += 1
+            expected = arm.latency
+
+        logger.info(
+            f"Routing {key} task {getattr(task, 'job_id', '?')} to {backend}"
+            + (f" (expected {expected:.2f}s)" if expected is not None else "")
+            + (" [explore]" if explored else "")
+        )
+        return RoutingDecision(key=key, backend=backend, expected_latency=expected, explored=explored)
+
+    def run(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        """Route and execute a task."""
+        decision = self.route(task)
+        try:
+            result = self.executors[decision.backend].run(task, context)
+        except BaseException:
+            self._release(decision)
+            raise
+        self._record_result(task, decision, result)
+        return result
+
+    async def run_async(self, task: Any, context: Optional[Dict] = None) -> ExecutionResult:
+        decision = self.route(task)
+        try:
+            result = await self.executors[decision.backend].run_async(task, context)
+        except BaseException:
+            self._release(decision)
+            raise
+        self._record_result(task, decision, result)
+        return result
+
+    def execute(self, task: Any, context: Optional[Dict] = None) -> str:
+        return self.run(task, context).output
+
+    async def execute_async(self, task: Any, context: Optional[Dict] = None) -> str:
+        return (await self.run_async(task, context)).output
+
+    def _record_result(self, task: Any, decision: RoutingDecision, result: ExecutionResult):
+        result.backend = result.backend or decision.backend
+        decision.result = result
+        if not result.ok:
+            self._finish(decision, delivered=False)
+            return
+        stale = []
+        with self._lock:
+            self._pending[_task_id(task)] = decision
+            while len(self._pending) > self.max_pending:
+                stale.append(self._pending.popitem(last=False)[1])
+        for old in stale:
+            self._finish(old, delivered=True)
+
+    def record_outcome(self, task: Any, delivered: bool, upvotes: int = 0):
+        """Report whether a routed task's result was delivered (and upvoted)."""
+        with self._lock:
+            decision = self._pending.pop(_task_id(task), None)
+        if decision is not None:
+            self._finish(decision, delivered, upvotes)
+
+    def _release(self, decision: RoutingDecision):
+        """Drop a decision's in-flight pull without scoring it."""
+        with self._lock:
+            arm = self._arm(decision.key, decision.backend)
+            arm.in_flight = max(0, arm.in_flight - 1)
+
+    def _cost(self, backend: str, result: ExecutionResult) -> float:
+        return (result.tokens or 0) / 1000 * self.cost_per_1k_tokens.get(backend, 0.0)
+
+    def _finish(self, decision: RoutingDecision, delivered: bool, upvotes: int = 0):
+        result = decision.result
+        cost = self._cost(decision.backend, result)
+        reward = 0.0
+        if result.ok and delivered:
+            reward = (
+                1.0
+                + self.upvote_weight * upvotes
+                - self.latency_weight * min(1.0, result.latency / self.latency_target)
+                - self.cost_weight * min(1.0, cost / self.cost_target if self.cost_target else 0.0)
+            )
+            reward = max(0.0, reward)
+
+        with self._lock:
+            arm = self._arm(decision.key, decision.backend)
+            arm.in_flight = max(0, arm.in_flight - 1)
+            arm.update(reward, result.latency, cost, self.decay)
+            self.history.append({
+                "time": time.time(),
+                "key": decision.key,
+                "backend": decision.backend,
+                "explored": decision.explored,
+                "expected_latency": decision.expected_latency,
+                "latency": result.latency,
+                "status": result.status,
+                "delivered": delivered,
+                "reward": reward,
+            })
+
+        expected = "n/a" if decision.expected_latency is None else f"{decision.expected_latency:.2f}s"
+        logger.info(
+            f"Routed {decision.key} to {decision.backend}: {result.status}, "
+            f"latency {result.latency:.2f}s (expected {expected}), reward {reward:.2f}"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-route, per-backend reward, latency and cost estimates."""
+        with self._lock:
+            stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (key, backend), arm in self._arms.items():
+                stats.setdefault(key, {})[backend] = {
+                    "pulls": arm.pulls,
+                    "in_flight": arm.in_flight,
+                    "reward": arm.mean,
+                    "latency": arm.latency,
+                    "cost": arm.cost,
+                }
+            return stats
+
+
+def _task_id(task: Any) -> Tuple[str, str]:
+    return (getattr(task, "post_id", ""), getattr(task, "job_id", ""))
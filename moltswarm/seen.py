@@ -0,0 +1,124 @@
+"""Memory-bounded probabilistic seen-set for long-running nodes."""
+
+import hashlib
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """Size a filter for ``capacity`` keys at the given false-positive rate."""
+        bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        return cls(bits, round(bits / max(1, capacity) * math.log(2)))
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_error_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class SeenSet:
+    """Rotating Bloom filters with time-based generations.
+
+    Keys are added to the newest generation; lookups check all of them. A
+    new generation starts once the current one holds its share of
+    ``capacity`` or is older than ``rotate_after`` seconds, and the oldest
+    generation is dropped, so memory stays constant and keys are forgotten
+    after roughly ``generations * rotate_after`` seconds.
+
+    A hit means "probably seen" and must be confirmed against exact state;
+    a miss is definite. ``max_bytes`` caps total memory, trading a higher
+    false-positive rate for the ceiling.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        error_rate: float = 0.01,
+        generations: int = 2,
+        rotate_after: float = 86400,
+        max_bytes: Optional[int] = None,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.generations = max(1, generations)
+        self.rotate_after = rotate_after
+        self.max_bytes = max_bytes
+        self.rotations = 0
+
+        self._per_generation = max(1, capacity // self.generations)
+        self._filters: List[BloomFilter] = []
+        self._started: List[float] = []
+        self._rotate()
+
+    def _new_filter(self) -> BloomFilter:
+        bloom = BloomFilter.for_capacity(self._per_generation, self.error_rate)
+        if self.max_bytes is not None:
+            max_bits = self.max_bytes * 8 // self.generations
+            if bloom.num_bits > max_bits:
+                hashes = max(1, round(max_bits / self._per_generation * math.log(2)))
+                bloom = BloomFilter(max_bits, hashes)
+        return bloom
+
+    def _rotate(self):
+        self._filters.append(self._new_filter())
+        self._started.append(time.monotonic())
+        if len(self._filters) > self.generations:
+            self._filters.pop(0)
+            self._started.pop(0)
+            self.rotations += 1
+
+    def _maybe_rotate(self):
+        current = self._filters[-1]
+        if current.count >= self._per_generation or time.monotonic() - self._started[-1] >= self.rotate_after:
+            self._rotate()
+
+    def add(self, key: str):
+        self._maybe_rotate()
+        self._filters[-1].add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in bloom for bloom in reversed(self._filters))
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and expected false-positive rate."""
+        miss = 1.0
+        for bloom in self._filters:
+            miss *= 1 - bloom.estimated_error_rate()
+        return {
+            "generations": len(self._filters),
+            "items": sum(b.count for b in self._filters),
+            "capacity": self.capacity,
+            "fill": self._filters[-1].count / self._per_generation,
+            "bytes": sum(b.size_bytes for b in self._filters),
+            "estimated_error_rate": 1 - miss,
+            "rotations": self.rotations,
+        }
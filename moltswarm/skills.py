@@ -1,10 +1,16 @@
 """Skill management system for MoltSwarm."""
 
-from typing import Callable, Dict, List, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from functools import wraps
 
 
+def normalize_tag(tag: str) -> str:
+    """Normalize a skill tag for comparison (strip '#', lowercase)."""
+    return tag.lstrip("#").lower()
+
+
 @dataclass
 class Skill:
     """Represents a skill that an AI agent can perform."""
@@ -22,9 +28,16 @@ class Skill:
 class SkillRegistry:
     """Registry for managing agent skills."""
 
-    def __init__(self):
+    def __init__(self, max_cached_matches: int = 1024):
         self._skills: Dict[str, Skill] = {}
 
+        # Dispatch table, rebuilt lazily after register()
+        self._tag_index: Optional[Dict[str, List[Skill]]] = None
+        self._tags: List[str] = []
+        # Memoized matches per normalized skill set (LRU)
+        self.max_cached_matches = max_cached_matches
+        self._match_cache: "OrderedDict[Tuple[str, ...], Optional[Skill]]" = OrderedDict()
+
     def register(self, name: str, description: str = "", tags: Optional[List[str]] = None):
         """Decorator to register a skill handler.
 
@@ -40,6 +53,7 @@ class SkillRegistry:
                 description=description,
                 tags=tags or [f"#SKILL_{name.upper()}"]
             )
+            self._invalidate()
             return func
         return decorator
 
@@ -53,24 +67,76 @@ class SkillRegistry:
 
     def get_tags(self) -> List[str]:
         """Get all skill tags."""
-        tags = []
-        for skill in self._skills.values():
-            tags.extend(skill.tags)
-        return list(set(tags))
+        self._ensure_index()
+        return list(self._tags)
 
     def can_handle(self, task_skills: List[str]) -> bool:
         """Check if registry can handle a task with required skills."""
-        my_tags = self.get_tags()
-        my_tags_normalized = [t.lstrip("#").lower() for t in my_tags]
-        task_normalized = [t.lstrip("#").lower() for t in task_skills]
+        index = self._ensure_index()
+        return any(normalize_tag(req) in index for req in task_skills)
 
-        return any(req in my_tags_normalized for req in task_normalized)
+    def find_skill(self, task_skills: List[str]) -> Optional[Skill]:
+        """Find the most specific skill for a task.
+
+        A registered tag matches a task skill exactly or as a substring.
+        Skills are ranked by exact matches first, then by the number of
+        overlapping tags; ties go to the skill registered first. Results
+        are memoized per normalized skill set (the ``max_cached_matches``
+        most recent) until the next register().
+        """
+        required = {normalize_tag(t) for t in task_skills}
+        key = tuple(sorted(required))
+        if key in self._match_cache:
+            self._match_cache.move_to_end(key)
+            return self._match_cache[key]
+
+        index = self._ensure_index()
+
+        # score per skill name: [exact matches, overlapping tags]
+        scores: Dict[str, List[int]] = {}
+        for tag, skills in index.items():
+            if tag in required:
+                exact = 1
+            elif any(tag in req for req in required):
+                exact = 0
+            else:
+                continue
+            for skill in skills:
+                score = scores.setdefault(skill.name, [0, 0])
+                score[0] += exact
+                score[1] += 1
+
+        best: Optional[Skill] = None
+        best_score: Tuple[int, int] = (0, 0)
+        for name, skill in self._skills.items():
+            score = tuple(scores.get(name, (0, 0)))
+            if score > best_score:
+                best, best_score = skill, score
+
+        self._match_cache[key] = best
+        while len(self._match_cache) > self.max_cached_matches:
+            self._match_cache.popitem(last=False)
+        return best
 
     def find_handler(self, task_skills: List[str]) -> Optional[Callable]:
         """Find the best handler for a task based on skills."""
-        for skill_name, skill in self._skills.items():
-            for tag in skill.tags:
-                tag_normalized = tag.lstrip("#").lower()
-                if any(tag_normalized in t.lstrip("#").lower() for t in task_skills):
-                    return skill.handler
-        return None
+        skill = self.find_skill(task_skills)
+        return skill.handler if skill else None
+
+    def _invalidate(self):
+        """Drop the dispatch table and memoized matches."""
+        self._tag_index = None
+        self._match_cache.clear()
+
+    def _ensure_index(self) -> Dict[str, List[Skill]]:
+        """Build the normalized tag -> skills index if needed."""
+        if self._tag_index is None:
+            index: Dict[str, List[Skill]] = {}
+            tags = set()
+            for skill in self._skills.values():
+                tags.update(skill.tags)
+                for tag in dict.fromkeys(normalize_tag(t) for t in skill.tags):
+                    index.setdefault(tag, []).append(skill)
+            self._tag_index = index
+            self._tags = list(tags)
+        return self._tag_index
@@ -0,0 +1,556 @@
+"""Task sources for MoltSwarm nodes.
+
+A node pulls tasks from one or more sources:
+- FeedSource: polls the Moltbook feeds (the default)
+- WebhookSource: local HTTP endpoint for push integrations and relays
+- SpoolSource: JSON-lines file that other processes append to
+- QueueSource: in-process queue, e.g. for tests and embedding
+- BackfillSource: slowly crawls older posts for still-open jobs
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from moltswarm.protocols import ClaimIndex, JobClaimState, Task, parse_timestamp, server_clock
+
+
+logger = logging.getLogger("MoltSwarm")
+
+
+def tasks_from_posts(posts: Iterable[Dict[str, Any]]) -> List[Task]:
+    """Parse swarm tasks out of post dicts, skipping expired ones."""
+    tasks = []
+    for post in posts:
+        task = Task.from_post(post) if isinstance(post, dict) else None
+        if task and not task.is_expired():
+            tasks.append(task)
+    return tasks
+
+
+class TaskSource(ABC):
+    """Base class for task sources.
+
+    ``poll()`` must not block: it returns whatever tasks are ready now.
+    Sources that call the API set ``blocking = True``; the node then polls
+    them in a worker thread and collects their tasks when the poll ends.
+    Push sources call the ``notify`` callback given to ``start()`` when
+    new tasks arrive so the node can poll them immediately.
+    """
+
+    name = "source"
+    priority = 0  # lower is handled first
+    blocking = False  # poll() makes network calls
+
+    def start(self, notify: Callable[[], None]):
+        """Start background work. ``notify`` may be called from any thread."""
+        self._notify = notify
+
+    def stop(self):
+        """Stop background work."""
+
+    @abstractmethod
+    def poll(self) -> List[Task]:
+        """Return the tasks available now."""
+
+    def next_poll_in(self) -> Optional[float]:
+        """Seconds until this source wants to be polled again (None = only on notify)."""
+        return None
+
+    def _wake(self):
+        notify = getattr(self, "_notify", None)
+        if notify:
+            notify()
+
+
+class _BufferedSource(TaskSource):
+    """Source backed by a thread-safe buffer of tasks."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Task]" = queue.Queue()
+
+    def poll(self) -> List[Task]:
+        tasks = []
+        while True:
+            try:
+                tasks.append(self._queue.get_nowait())
+            except queue.Empty:
+                return tasks
+
+    def _push(self, tasks: Iterable[Task]) -> int:
+        count = 0
+        for task in tasks:
+            self._queue.put(task)
+            count += 1
+        if count:
+            self._wake()
+        return count
+
+
+class SubscriptionPlanner:
+    """Subscribes to the submolts that matching swarm jobs come from.
+
+    It counts which submolts matching jobs are posted in and subscribes
+    to the smallest set that covers ``target_share`` of them. It also
+    tracks how many jobs found in the global feed were already in the
+    personalized feed. Once that coverage reaches ``target_coverage``,
+    the global feed is only polled every ``global_every`` polls.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        accept: Optional[Callable[[Task], bool]] = None,
+        target_share: float = 0.95,
+        target_coverage: float = 0.95,
+        max_subscriptions: int = 10,
+        min_samples: int = 20,
+        window: int = 200,
+        global_every: int = 10,
+        plan_every: int = 10,
+    ):
+        self.client = client
+        self.accept = accept
+        self.target_share = target_share
+        self.target_coverage = target_coverage
+        self.max_subscriptions = max_subscriptions
+        self.min_samples = min_samples
+        self.global_every = global_every
+        self.plan_every = plan_every
+
+        self.submolt_counts: Counter = Counter()
+        self.subscribed: Set[str] = set()
+        self._covered: Deque[bool] = deque(maxlen=window)
+        self._polls = 0
+        self.global_polls = 0
+        self.global_polls_skipped = 0
+
+    def coverage(self) -> float:
+        """Share of recent matching global-feed jobs the personalized feed also had."""
+        return sum(self._covered) / len(self._covered) if self._covered else 0.0
+
+    def should_poll_global(self) -> bool:
+        self._polls += 1
+        covered = len(self._covered) >= self.min_samples and self.coverage() >= self.target_coverage
+        if covered and self._polls % self.global_every:
+            self.global_polls_skipped += 1
+            return False
+        self.global_polls += 1
+        return True
+
+    def observe(self, personal: List[Task], global_: Optional[List[Task]]):
+        """Record one poll. ``global_`` is None when the global feed was skipped."""
+        personal = [t for t in personal if self._matches(t)]
+        personal_keys = {(t.post_id, t.job_id) for t in personal}
+        seen = set(personal_keys)
+        for task in personal:
+            if task.submolt:
+                self.submolt_counts[task.submolt] += 1
+
+        if global_ is not None:
+            for task in global_:
+                key = (task.post_id, task.job_id)
+                if not self._matches(task):
+                    continue
+                self._covered.append(key in personal_keys)
+                if key not in seen and task.submolt:
+                    seen.add(key)
+                    self.submolt_counts[task.submolt] += 1
+
+        if self._polls % self.plan_every == 0:
+            self.plan()
+
+    def plan(self):
+        """Subscribe to the submolts that cover most matching jobs."""
+        total = sum(self.submolt_counts.values())
+        if total < self.min_samples:
+            return
+
+        wanted = set()
+        covered = 0
+        for name, count in self.submolt_counts.most_common(self.max_subscriptions):
+            if covered / total >= self.target_share:
+                break
+            wanted.add(name)
+            covered += count
+
+        for name in sorted(wanted - self.subscribed):
+            try:
+                self.client.subscribe(name)
+                self.subscribed.add(name)
+                logger.info(f"Subscribed to m/{name} for swarm jobs")
+            except Exception as e:
+                logger.warning(f"Failed to subscribe to {name}: {e}")
+        for name in sorted(self.subscribed - wanted):
+            try:
+                self.client.unsubscribe(name)
+                self.subscribed.discard(name)
+                logger.info(f"Unsubscribed from m/{name}")
+            except Exception as e:
+                logger.warning(f"Failed to unsubscribe from {name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Coverage and feed requests saved by skipping the global poll."""
+        polls = self.global_polls + self.global_polls_skipped
+        return {
+            "coverage": self.coverage(),
+            "subscriptions": sorted(self.subscribed),
+            "global_polls": self.global_polls,
+            "global_polls_skipped": self.global_polls_skipped,
+            "requests_saved": self.global_polls_skipped,
+            "request_savings": self.global_polls_skipped / (2 * polls) if polls else 0.0,
+        }
+
+    def _matches(self, task: Task) -> bool:
+        return self.accept is None or self.accept(task)
+
+
+class FeedSource(TaskSource):
+    """Polls the personalized and global Moltbook feeds.
+
+    With a SubscriptionPlanner the global feed is skipped once the
+    personalized feed covers the node's jobs.
+    """
+
+    name = "feed"
+    blocking = True
+
+    def __init__(
+        self,
+        client: Any,
+        limit: int = 25,
+        interval: float = 60,
+        planner: Optional[SubscriptionPlanner] = None,
+    ):
+        self.client = client
+        self.limit = limit
+        self.interval = interval
+        self.planner = planner
+        self._next_poll = 0.0
+
+    def poll(self) -> List[Task]:
+        if time.monotonic() < self._next_poll:
+            return []
+        self._next_poll = time.monotonic() + self.interval
+
+        # Posts are decoded one at a time
+        personal = tasks_from_posts(self.client.iter_personalized_feed(sort="new", limit=self.limit))
+        global_ = None
+        if self.planner is None or self.planner.should_poll_global():
+            global_ = tasks_from_posts(self.client.iter_feed(sort="new", limit=self.limit))
+        if self.planner is not None:
+            self.planner.observe(personal, global_)
+
+        tasks = personal + (global_ or [])
+        logger.info(f"Discovered {len(tasks)} tasks")
+        return tasks
+
+    def next_poll_in(self) -> Optional[float]:
+        return max(0.0, self._next_poll - time.monotonic())
+
+
+class QueueSource(_BufferedSource):
+    """In-process queue of tasks."""
+
+    name = "queue"
+
+    def put(self, task: Task):
+        """Add a task and wake the node."""
+        self._push([task])
+
+    def put_many(self, tasks: Iterable[Task]) -> int:
+        """Add several tasks and wake the node once."""
+        return self._push(tasks)
+
+    def put_post(self, post: Dict[str, Any]) -> bool:
+        """Parse a Moltbook post and queue it if it is a live swarm task."""
+        return self._push(tasks_from_posts([post])) > 0
+
+
+class SpoolSource(TaskSource):
+    """Reads Moltbook post objects from a JSON-lines spool file.
+
+    Only lines appended since the last poll are parsed. A file that shrinks
+    (truncated or rotated) is read again from the start.
+    """
+
+    name = "spool"
+
+    def __init__(self, path: str, interval: float = 1.0):
+        self.path = path
+        self.interval = interval
+        self._offset = 0
+        self._next_poll = 0.0
+
+    def poll(self) -> List[Task]:
+        if time.monotonic() < self._next_poll:
+            return []
+        self._next_poll = time.monotonic() + self.interval
+
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self._offset:
+            self._offset = 0
+        if size == self._offset:
+            return []
+
+        posts = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line, wait for the writer
+                self._offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    posts.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping invalid spool line in {self.path}")
+        return tasks_from_posts(posts)
+
+    def next_poll_in(self) -> Optional[float]:
+        return max(0.0, self._next_poll - time.monotonic())
+
+
+class WebhookSource(_BufferedSource):
+    """Local HTTP receiver for pushed posts.
+
+    Accepts ``POST <path>`` with a post object, a list of posts, or
+    ``{"posts": [...]}``. If ``token`` is set, requests must carry it in
+    the ``X-MoltSwarm-Token`` header. Requests need a valid Content-Length
+    of at most ``max_body`` bytes.
+    """
+
+    name = "webhook"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8787,
+        path: str = "/tasks",
+        token: Optional[str] = None,
+        max_body: int = 1024 * 1024,
+    ):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.token = token
+        self.max_body = max_body
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound, useful with port=0."""
+        return self._server.server_address if self._server else (self.host, self.port)
+
+    def start(self, notify: Callable[[], None]):
+        super().start(notify)
+        source = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != source.path:
+                    return self._reply(404, {"error": "not found"})
+                if source.token and self.headers.get("X-MoltSwarm-Token") != source.token:
+                    return self._reply(401, {"error": "unauthorized"})
+                header = self.headers.get("Content-Length")
+                if header is None:
+                    return self._reply(411, {"error": "length required"})
+                try:
+                    length = int(header)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    return self._reply(400, {"error": "invalid content-length"})
+                if length > source.max_body:
+                    return self._reply(413, {"error": "body too large"})
+                try:
+                    data = json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    return self._reply(400, {"error": "invalid json"})
+
+                if isinstance(data, dict) and "posts" in data:
+                    posts = data["posts"]
+                elif isinstance(data, list):
+                    posts = data
+                else:
+                    posts = [data]
+                accepted = source._push(tasks_from_posts(posts if isinstance(posts, list) else []))
+                self._reply(202, {"accepted": accepted})
+
+            def _reply(self, status: int, body: Dict[str, Any]):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug("webhook: " + format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook source listening on {self.address[0]}:{self.address[1]}{self.path}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class BackfillSource(TaskSource):
+    """Crawls older feed pages and search results for unclaimed open jobs.
+
+    The newest feed page is covered by FeedSource; this source pages back
+    through the feed (and one search for swarm jobs) until posts are older
+    than ``max_age``, then waits ``rescan_interval`` before the next pass.
+    Each poll spends at most ``max_requests`` API calls, and nothing at all
+    while the API is rate limiting or the client's circuit breaker is open,
+    so it never competes with fresh-job discovery. Its tasks are handled
+    after those of other sources.
+    """
+
+    name = "backfill"
+    priority = 10
+    blocking = True
+
+    def __init__(
+        self,
+        client: Any,
+        max_age: float = 7 * 86400,
+        page_size: int = 50,
+        interval: float = 120,
+        rescan_interval: float = 3600,
+        max_requests: int = 5,
+        search_query: Optional[str] = "#SWARM_JOB",
+        accept: Optional[Callable[[Task], bool]] = None,
+        claim_state: Optional[Callable[[Task], Optional[JobClaimState]]] = None,
+        quiet_period: float = 300,
+    ):
+        self.client = client
+        self.max_age = max_age
+        self.page_size = page_size
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.max_requests = max_requests
+        self.search_query = search_query
+        self.accept = accept
+        self.claim_state = claim_state or self._claim_state
+        self.quiet_period = quiet_period
+
+        self._next_poll = 0.0
+        self._next_pass = 0.0
+        self._in_pass = False
+        self._cursor: Optional[str] = None
+        self._feed_done = False
+        self._search_done = False
+        self._pending: List[Task] = []
+        self._seen = set()
+        self._indexes: Dict[str, ClaimIndex] = {}
+
+    def poll(self) -> List[Task]:
+        now = time.monotonic()
+        if now < self._next_poll or self._throttled():
+            return []
+        self._next_poll = now + self.interval
+
+        if not self._in_pass:
+            if now < self._next_pass:
+                return []
+            self._start_pass()
+
+        budget = self.max_requests
+        if not self._search_done and self.search_query and budget > 0:
+            self._add_candidates(self.client.search_posts(self.search_query, limit=self.page_size))
+            self._search_done = True
+            budget -= 1
+        if not self._feed_done and budget > 0 and not self._pending:
+            self._crawl_page()
+            budget -= 1
+
+        tasks = []
+        while self._pending and budget > 0:
+            task = self._pending.pop(0)
+            state = self.claim_state(task)
+            budget -= 1
+            if task.is_expired():
+                continue
+            if state and (state.delivered or state.is_claimed(task.claim_timeout)):
+                continue
+            tasks.append(task)
+
+        if self._feed_done and (self._search_done or not self.search_query) and not self._pending:
+            self._in_pass = False
+            self._next_pass = time.monotonic() + self.rescan_interval
+            logger.info(f"Backfill pass finished ({len(self._seen)} jobs seen)")
+
+        if tasks:
+            logger.info(f"Backfill found {len(tasks)} open tasks")
+        return tasks
+
+    def next_poll_in(self) -> Optional[float]:
+        return max(0.0, self._next_poll - time.monotonic())
+
+    def _throttled(self) -> bool:
+        """Skip polling while the API is pushing back."""
+        breaker = getattr(self.client, "breaker", None)
+        if breaker is not None and breaker.state != "closed":
+            return True
+        limited_at = getattr(self.client, "rate_limited_at", None)
+        return limited_at is not None and time.monotonic() - limited_at < self.quiet_period
+
+    def _start_pass(self):
+        self._in_pass = True
+        self._cursor = None
+        self._feed_done = False
+        self._search_done = False
+        self._seen.clear()
+        self._indexes.clear()
+
+    def _crawl_page(self):
+        posts, self._cursor = self.client.get_feed_page(
+            sort="new", limit=self.page_size, cursor=self._cursor
+        )
+        cutoff = server_clock.now() - self.max_age
+        fresh = []
+        for post in posts:
+            created_at = parse_timestamp(post.get("created_at", ""))
+            if created_at is not None and created_at < cutoff:
+                self._feed_done = True
+                break
+            fresh.append(post)
+        if not self._cursor or not posts:
+            self._feed_done = True
+        self._add_candidates(fresh)
+
+    def _add_candidates(self, posts: Iterable[Dict[str, Any]]):
+        for task in tasks_from_posts(posts):
+            key = (task.post_id, task.job_id)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            if self.accept is None or self.accept(task):
+                self._pending.append(task)
+
+    def _claim_state(self, task: Task) -> Optional[JobClaimState]:
+        index = self._indexes.get(task.post_id)
+        if index is None:
+            index = self._indexes[task.post_id] = ClaimIndex()
+        index.update(self.client.get_comments(task.post_id, since=index.newest))
+        return index.get(task.job_id)
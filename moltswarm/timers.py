@@ -0,0 +1,87 @@
+"""Timer queue for task deadlines and claim leases."""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+
+@dataclass(order=True)
+class Timer:
+    """A scheduled callback. Cancelling is O(1); the entry is dropped lazily."""
+
+    when: float
+    seq: int
+    callback: Callable = field(compare=False)
+    args: Tuple[Any, ...] = field(compare=False, default=())
+    cancelled: bool = field(compare=False, default=False)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerQueue:
+    """Min-heap of timers keyed by absolute time.
+
+    Scheduling is O(log n), cancellation O(1) and firing amortized
+    O(log n) per timer, so thousands of queued deadlines never need a full
+    scan. Cancelled entries are removed lazily and the heap is compacted
+    once they make up most of it. Not thread-safe: use it from one thread
+    (the node's event loop).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._heap: List[Timer] = []
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def schedule(self, when: float, callback: Callable, *args: Any) -> Timer:
+        """Run ``callback(*args)`` at absolute time ``when`` (in clock units)."""
+        timer = Timer(when, next(self._seq), callback, args)
+        heapq.heappush(self._heap, timer)
+        return timer
+
+    def schedule_in(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Run ``callback(*args)`` ``delay`` seconds from now."""
+        return self.schedule(self.clock() + delay, callback, *args)
+
+    def cancel(self, timer: Optional[Timer]):
+        if timer is None or timer.cancelled:
+            return
+        timer.cancel()
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._heap = [t for t in self._heap if not t.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """Fire every timer due at ``now``. Returns how many fired."""
+        now = self.clock() if now is None else now
+        fired = 0
+        while self._heap and self._heap[0].when <= now:
+            timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+            timer.cancelled = True  # fired timers can't be cancelled again
+            timer.callback(*timer.args)
+            fired += 1
+        self.fired += fired
+        return fired
+
+    def next_due_in(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next live timer, or None if there is none."""
+        now = self.clock() if now is None else now
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0].when - now)
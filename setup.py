@@ -19,6 +19,9 @@ setup(
         "pyyaml>=6.0",
     ],
     extras_require={
+        "stream": [
+            "ijson>=3.2",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
@@ -0,0 +1,104 @@
+"""Tests for provider budgets."""
+
+import threading
+import time
+
+import pytest
+
+from moltswarm.budget import BudgetExceededError, BudgetManager, ProviderBudget, estimate_tokens
+
+
+def test_estimate_tokens():
+    """Test the character-based token estimate."""
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 100
+
+
+def test_rpm_limit_delays_requests():
+    """Test that requests over the RPM limit wait for the window."""
+    budget = BudgetManager({"openai": ProviderBudget(rpm=2)}, window=0.1)
+
+    started = time.monotonic()
+    for _ in range(3):
+        budget.acquire("openai", 10, 10)
+
+    assert time.monotonic() - started >= 0.09
+    assert budget.stats()["openai"]["admitted"] == 3
+    assert budget.acquire("unbudgeted", 10) is None
+
+
+def test_tpm_settles_to_actual_usage():
+    """Test that settle() frees tokens reserved beyond actual usage."""
+    budget = BudgetManager({"openai": ProviderBudget(tpm=1000)}, window=5)
+
+    reservation = budget.acquire("openai", 100, 800)
+    budget.settle(reservation, 100, 50)
+    assert budget.stats()["openai"]["tokens_in_window"] == 150
+
+    started = time.monotonic()
+    budget.acquire("openai", 100, 700)
+    assert time.monotonic() - started < 1
+
+
+def test_daily_cost_ceiling():
+    """Test that the cost ceiling rejects requests and refuses admission."""
+    budget = BudgetManager({"openai": ProviderBudget(daily_cost=0.01, cost_per_1k_prompt=0.01)})
+
+    reservation = budget.acquire("openai", 600, 0)
+    assert budget.admits()
+    with pytest.raises(BudgetExceededError):
+        budget.acquire("openai", 600, 0)
+
+    budget.settle(reservation, 1000, 0)
+    assert not budget.admits()
+    assert budget.stats()["openai"]["rejected"] == 1
+
+
+def test_admits_checks_only_the_tasks_provider():
+    """Test that an exhausted provider only defers the tasks routed to it."""
+    from types import SimpleNamespace
+
+    budget = BudgetManager(
+        {
+            "openai": ProviderBudget(daily_cost=0.01, cost_per_1k_prompt=0.01),
+            "anthropic": ProviderBudget(daily_cost=1.0, cost_per_1k_prompt=0.01),
+        },
+        provider_for=lambda task: {"code": "openai", "write": "anthropic"}.get(task.type),
+    )
+    budget.settle(budget.acquire("openai", 1000, 0), 1000, 0)
+
+    assert not budget.admits(SimpleNamespace(type="code"))
+    assert budget.admits(SimpleNamespace(type="write"))
+    assert budget.admits(SimpleNamespace(type="review"))
+    assert not budget.admits()
+
+
+def test_wait_timeout():
+    """Test that a request gives up after max_wait."""
+    budget = BudgetManager({"openai": ProviderBudget(rpm=1)}, max_wait=0.05, window=10)
+    budget.acquire("openai", 10)
+
+    with pytest.raises(BudgetExceededError):
+        budget.acquire("openai", 10)
+
+
+def test_skills_take_turns():
+    """Test fair admission across skills."""
+    budget = BudgetManager({"openai": ProviderBudget(rpm=1)}, window=0.05)
+    budget.acquire("openai", 1, 0, skill="#SKILL_CODE")
+    order = []
+
+    def request(skill):
+        budget.acquire("openai", 1, 0, skill=skill)
+        order.append(skill)
+
+    threads = []
+    for skill in ["#SKILL_CODE", "#SKILL_CODE", "#SKILL_CODE", "#SKILL_WRITE"]:
+        thread = threading.Thread(target=request, args=(skill,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    assert order.index("#SKILL_WRITE") <= 1
@@ -0,0 +1,374 @@
+"""Tests for MoltSwarm Moltbook client."""
+
+import asyncio
+import json
+import time
+
+import requests
+
+from moltswarm.client import MoltbookClient
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self._data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class FakeSession:
+    """Records requests and replays canned responses."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.headers = {}
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.handler(method, url, **kwargs)
+
+
+def make_client(handler):
+    client = MoltbookClient(api_key="test")
+    client.session = FakeSession(handler)
+    return client
+
+
+COMMENTS = [
+    {"id": f"c{i}", "content": f"comment {i}", "created_at": f"2025-02-03T1{i}:00:00Z"}
+    for i in range(5, -1, -1)
+]
+
+
+def paged_comments(method, url, params=None, **kwargs):
+    """Serve COMMENTS newest-first in pages of ``limit``."""
+    start = int(params.get("cursor") or 0)
+    end = start + params["limit"]
+    next_cursor = str(end) if end < len(COMMENTS) else None
+    return FakeResponse({"comments": COMMENTS[start:end], "next_cursor": next_cursor})
+
+
+def test_get_comments_page():
+    """Test fetching a single page of comments."""
+    client = make_client(paged_comments)
+
+    comments, cursor = client.get_comments_page("post_1", limit=2)
+
+    assert [c["id"] for c in comments] == ["c5", "c4"]
+    assert cursor == "2"
+
+
+def test_iter_comments_all_pages():
+    """Test iterating through every page."""
+    client = make_client(paged_comments)
+
+    ids = [c["id"] for c in client.iter_comments("post_1", limit=2)]
+
+    assert ids == ["c5", "c4", "c3", "c2", "c1", "c0"]
+    assert len(client.session.calls) == 3
+
+
+def test_get_comments_since_stops_early():
+    """Test that since mode only fetches the delta."""
+    client = make_client(paged_comments)
+
+    comments = client.get_comments("post_1", limit=2, since="2025-02-03T14:00:00Z")
+
+    assert [c["id"] for c in comments] == ["c5", "c4"]
+    assert len(client.session.calls) == 2
+
+
+def test_aiter_comments():
+    """Test the async comment iterator."""
+    client = make_client(paged_comments)
+
+    async def collect():
+        return [c["id"] async for c in client.aiter_comments("post_1", limit=4, since="2025-02-03T13:00:00Z")]
+
+    assert asyncio.run(collect()) == ["c5", "c4", "c3"]
+
+
+def test_response_cache_hits_and_invalidation():
+    """Test cached reads and invalidation on write."""
+    from moltswarm.cache import ResponseCache
+
+    def handler(method, url, **kwargs):
+        if method == "POST":
+            return FakeResponse({"success": True})
+        return FakeResponse({"comments": [{"id": "c1"}]})
+
+    client = make_client(handler)
+    client.cache = ResponseCache()
+
+    client.get_comments("post_1")
+    client.get_comments("post_1")
+    assert len(client.session.calls) == 1
+    assert client.cache_stats()["hits"] == 1
+
+    client.add_comment("post_1", "hello")
+    client.get_comments("post_1")
+    assert len(client.session.calls) == 3
+    assert client.cache_stats()["misses"] == 2
+
+
+def test_response_cache_revalidates_with_etag():
+    """Test conditional requests for stale entries."""
+    from moltswarm.cache import ResponseCache
+
+    def handler(method, url, headers=None, **kwargs):
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(None, status_code=304)
+        return FakeResponse({"post": {"id": "p1"}}, headers={"ETag": '"v1"'})
+
+    client = make_client(handler)
+    client.cache = ResponseCache(ttls={"post": 0.001})
+
+    first = client.get_post("p1")
+    time.sleep(0.01)
+    second = client.get_post("p1")
+
+    assert second == first
+    assert client.cache_stats()["revalidations"] == 1
+
+
+def test_response_cache_evicts_lru_by_size():
+    """Test byte-bounded LRU eviction."""
+    from moltswarm.cache import ResponseCache
+
+    cache = ResponseCache(max_bytes=100)
+    cache.store(cache.key("posts/a"), "posts/a", {}, size=60)
+    cache.store(cache.key("posts/b"), "posts/b", {}, size=60)
+
+    assert cache.lookup(cache.key("posts/a")) is None
+    assert cache.lookup(cache.key("posts/b")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_identical_reads_are_coalesced():
+    """Test that identical in-flight GETs share one HTTP request."""
+    import threading
+
+    release = threading.Event()
+
+    def handler(method, url, **kwargs):
+        release.wait(timeout=5)
+        return FakeResponse({"comments": [{"id": "c1"}]})
+
+    client = make_client(handler)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.get_comments("post_1")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    while client.coalesce_stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(client.session.calls) == 1
+    assert len(results) == 5
+    assert all(r is results[0] for r in results)
+    assert client.coalesce_stats()["executed"] == 1
+
+
+def test_request_retries_server_errors():
+    """Test that 5xx responses on reads are retried."""
+    from moltswarm.resilience import RetryPolicy
+
+    statuses = [503, 502, 200]
+
+    def handler(method, url, **kwargs):
+        return FakeResponse({"post": {"id": "p1"}}, status_code=statuses.pop(0))
+
+    client = make_client(handler)
+    client.retry = RetryPolicy(backoff_base=0)
+
+    assert client.get_post("p1") == {"post": {"id": "p1"}}
+    assert len(client.session.calls) == 3
+    assert client.session.calls[0][2]["timeout"] == client.timeout
+
+
+def test_circuit_breaker_opens_after_failures():
+    """Test that the breaker stops requests during an outage."""
+    import pytest
+    from moltswarm.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+    def handler(method, url, **kwargs):
+        return FakeResponse({}, status_code=500)
+
+    client = make_client(handler)
+    client.retry = RetryPolicy(max_retries=0)
+    client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get_post("p1")
+
+    with pytest.raises(CircuitOpenError):
+        client.get_post("p1")
+    assert len(client.session.calls) == 2
+    assert client.breaker.is_open()
+    assert client.breaker.retry_after() > 0
+
+
+def test_circuit_breaker_half_open_probe():
+    """Test recovery through a single half-open probe."""
+    from moltswarm.resilience import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert breaker.allow() is False
+
+    time.sleep(0.02)
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_recovers_after_unexpected_probe_error():
+    """Test that a probe failing with a non-connection error doesn't wedge the breaker."""
+    import pytest
+    from moltswarm.resilience import CircuitBreaker
+
+    errors = [requests.exceptions.ChunkedEncodingError("truncated")]
+
+    def handler(method, url, **kwargs):
+        if errors:
+            raise errors.pop()
+        return FakeResponse({"post": {"id": "p1"}})
+
+    client = make_client(handler)
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    client.breaker.record_failure()
+    time.sleep(0.02)
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.get_post("p1")
+    assert client.breaker.is_open()
+
+    time.sleep(0.02)
+    assert client.get_post("p1") == {"post": {"id": "p1"}}
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_pool_size_follows_concurrency():
+    """Test connection pool sizing from node concurrency."""
+    from moltswarm.config import MoltbookConfig
+
+    client = MoltbookClient.from_config(MoltbookConfig(api_key="test"), concurrency=16)
+    adapter = client.session.get_adapter(client.base_url)
+
+    assert client.pool_size == 33
+    assert adapter._pool_maxsize == 33
+    assert client.transport_stats()["connections_opened"] == 0
+
+    client = MoltbookClient.from_config(MoltbookConfig(api_key="test", pool_size=4, compress=False))
+    assert client.pool_size == 4
+    assert client.session.headers["Accept-Encoding"] == "identity"
+
+
+class StreamingResponse(FakeResponse):
+    """Fake response exposing the body as a raw byte stream."""
+
+    def __init__(self, data):
+        import io
+        super().__init__(data)
+        self.raw = io.BytesIO(json.dumps(data).encode())
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_iter_feed_yields_slim_posts():
+    """Test streaming feed decoding keeps only the used fields."""
+    posts = [
+        {"id": "p1", "content": "hello", "author": {"name": "A", "karma": 5},
+         "created_at": "2025-02-03T10:00:00Z", "upvotes": 3, "submolt": {"name": "general"}},
+        {"id": "p2", "content": None, "author": None},
+    ]
+    responses = []
+
+    def handler(method, url, **kwargs):
+        assert kwargs.get("stream") is True
+        responses.append(StreamingResponse({"success": True, "posts": posts}))
+        return responses[-1]
+
+    client = make_client(handler)
+    items = list(client.iter_feed(limit=2))
+
+    assert items == [
+        {"id": "p1", "content": "hello", "author": {"name": "A"}, "created_at": "2025-02-03T10:00:00Z",
+         "submolt": {"name": "general"}},
+        {"id": "p2", "content": "", "author": {"name": ""}, "created_at": ""},
+    ]
+    assert responses[0].closed is True
+
+
+def test_idempotent_comment_not_duplicated_after_lost_response():
+    """Test that a retried write is skipped when the comment already landed."""
+    from moltswarm.resilience import RetryPolicy
+
+    stored = []
+
+    def handler(method, url, json=None, headers=None, **kwargs):
+        if method == "POST":
+            # The server commits the comment but the response is a 503
+            stored.append({"id": f"c{len(stored)}", "content": json["content"]})
+            return FakeResponse({}, status_code=503)
+        return FakeResponse({"comments": list(reversed(stored))})
+
+    client = make_client(handler)
+    client.retry = RetryPolicy(backoff_base=0)
+
+    result = client.add_comment("post_1", "🐝 **CLAIMING**: `job_id=job_1`", idempotency_key="k1")
+
+    assert result["deduplicated"] is True
+    assert len(stored) == 1
+    assert "`ref=k1`" in stored[0]["content"]
+    assert client.session.calls[0][2]["headers"]["Idempotency-Key"] == "k1"
+
+
+def test_idempotent_comment_retried_when_missing():
+    """Test that a failed write is retried when the comment did not land."""
+    from moltswarm.resilience import RetryPolicy
+
+    statuses = [503, 201]
+
+    def handler(method, url, **kwargs):
+        if method == "POST":
+            return FakeResponse({"success": True}, status_code=statuses.pop(0))
+        return FakeResponse({"comments": []})
+
+    client = make_client(handler)
+    client.retry = RetryPolicy(backoff_base=0)
+
+    assert client.add_comment("post_1", "hello", idempotency_key="k2") == {"success": True}
+    assert [c[0] for c in client.session.calls] == ["POST", "GET", "POST"]
+
+
+def test_client_tracks_server_clock_offset():
+    """Test that response Date headers feed the server clock."""
+    from email.utils import formatdate
+    from moltswarm.protocols import ServerClock
+
+    def handler(method, url, **kwargs):
+        return FakeResponse({"post": {}}, headers={"Date": formatdate(time.time() + 120, usegmt=True)})
+
+    client = make_client(handler)
+    client.clock = ServerClock()
+    client.get_post("p1")
+
+    assert 118 < client.clock_stats()["offset_seconds"] < 122
@@ -0,0 +1,676 @@
+"""Tests for MoltSwarm executors."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from moltswarm.executors import Executor, SubprocessRunner, ToolExecutor
+from moltswarm.protocols import Task
+
+
+def make_task():
+    return Task(
+        version="1.0",
+        job_id="job_123",
+        type="code",
+        skills=["#SKILL_CODE"],
+        reward_karma=False,
+        claim_timeout=3600,
+        title="Test",
+        description="Test task",
+        requirements=["req1"],
+    )
+
+
+def test_tool_executor_async():
+    """Test running a tool as a non-blocking subprocess."""
+    executor = ToolExecutor(sys.executable, ["-c", "import sys, json; print(json.loads(sys.argv[1])['title'])"])
+
+    assert asyncio.run(executor.execute_async(make_task())) == "Test"
+
+
+def test_subprocess_runner_timeout_kills_process():
+    """Test that timed out processes are killed."""
+    runner = SubprocessRunner()
+
+    start = time.monotonic()
+    result = asyncio.run(runner.run([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5))
+
+    assert result.timed_out is True
+    assert result.returncode is not None
+    assert time.monotonic() - start < 10
+
+
+def test_subprocess_runner_caps_output():
+    """Test that output beyond max_output is discarded."""
+    runner = SubprocessRunner(max_output=1000)
+
+    result = asyncio.run(runner.run([sys.executable, "-c", "print('x' * 100000)"]))
+
+    assert result.returncode == 0
+    assert len(result.stdout) == 1000
+    assert result.truncated is True
+
+
+def test_subprocess_runner_limits_concurrency():
+    """Test that at most max_concurrency processes run at once."""
+    runner = SubprocessRunner(max_concurrency=2)
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+    async def run_all():
+        start = time.monotonic()
+        await asyncio.gather(*(runner.run(cmd) for _ in range(4)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run_all()) >= 0.6
+
+
+def test_subprocess_runner_limit_holds_across_event_loops():
+    """Test that the limit is shared by loops running in different threads."""
+    runner = SubprocessRunner(max_concurrency=1)
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+    threads = [threading.Thread(target=lambda: asyncio.run(runner.run(cmd))) for _ in range(3)]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start >= 0.9
+
+
+def test_subprocess_runner_cancelled_waiter_frees_no_slot():
+    """Test that a cancelled wait doesn't leak or steal a slot."""
+    runner = SubprocessRunner(max_concurrency=1)
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+
+    async def scenario():
+        first = asyncio.ensure_future(runner.run(cmd))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(runner.run(cmd))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        await first
+        result = await asyncio.wait_for(runner.run(cmd), timeout=2)
+        return waiter.cancelled(), result.returncode
+
+    assert asyncio.run(scenario()) == (True, 0)
+
+
+WORKER = """
+import json, os, sys
+for line in sys.stdin:
+    task = json.loads(line)
+    if task["title"] == "crash":
+        sys.exit(1)
+    print(json.dumps({"result": f"{task['title']} by {os.getpid()}"}), flush=True)
+"""
+
+
+def test_tool_executor_persistent_workers_reuse_process():
+    """Test that persistent mode reuses one worker process."""
+    executor = ToolExecutor(sys.executable, ["-c", WORKER], persistent=True, workers=1, max_tasks_per_worker=3)
+    task = make_task()
+    try:
+        results = [executor.execute(task) for _ in range(3)]
+        pids = {r.split(" by ")[1] for r in results}
+        assert results[0].startswith("Test by ")
+        assert len(pids) == 1
+
+        # Recycled after max_tasks_per_worker
+        assert executor.execute(task).split(" by ")[1] not in pids
+        assert executor.pool.stats()["recycled"] == 1
+    finally:
+        executor.close()
+
+
+def test_tool_executor_persistent_worker_restarts_after_crash():
+    """Test that a crashed worker is replaced."""
+    executor = ToolExecutor(sys.executable, ["-c", WORKER], persistent=True, workers=1, timeout=5)
+    task = make_task()
+    try:
+        task.title = "crash"
+        assert executor.execute(task).startswith("Error")
+
+        task.title = "again"
+        assert executor.execute(task).startswith("again by ")
+        assert executor.pool.stats()["restarts"] >= 1
+    finally:
+        executor.close()
+
+
+def test_tool_executor_persistent_spawn_failure_frees_slot():
+    """Test that a worker that fails to start doesn't leak its slot."""
+    executor = ToolExecutor("/nonexistent/moltswarm-tool", persistent=True, workers=1, timeout=1)
+    try:
+        started = time.monotonic()
+        assert executor.execute(make_task()).startswith("Error")
+        assert executor.execute(make_task()).startswith("Error")
+        assert time.monotonic() - started < 1
+        stats = executor.pool.stats()
+        assert stats["started"] == 0
+        assert stats["spawn_failures"] == 2
+    finally:
+        executor.close()
+
+
+def test_tool_worker_pool_health_check_on_checkin():
+    """Test that dead idle workers are replaced when workers are checked in."""
+    from moltswarm.executors import ToolWorkerPool
+
+    pool = ToolWorkerPool([sys.executable, "-c", WORKER], size=2, health_interval=0)
+    try:
+        first = pool._checkout(1)
+        second = pool._checkout(1)
+        first.process.kill()
+        first.process.wait()
+        pool._idle.put(first)
+
+        pool._checkin(second)
+
+        assert pool.stats()["restarts"] == 1
+        assert pool.stats()["idle"] == 2
+        workers = [pool._idle.get_nowait() for _ in range(2)]
+        assert all(worker.alive() for worker in workers)
+        for worker in workers:
+            pool._idle.put(worker)
+    finally:
+        pool.close()
+
+
+def test_provider_clients_are_reused():
+    """Test that provider clients are created once and shared."""
+    from moltswarm.executors import ProviderClients
+
+    clients = ProviderClients()
+    session = clients.get("ollama")
+
+    assert clients.get("ollama") is session
+    assert clients.get("ollama", base_url="http://other:11434") is not session
+    clients.close()
+
+
+def test_ai_model_executor_uses_context_clients():
+    """Test that executors take shared clients from the context."""
+    from moltswarm.executors import AIModelExecutor, ProviderClients
+
+    class FakeSession:
+        def __init__(self):
+            self.posts = []
+
+        def post(self, url, json=None, timeout=None):
+            self.posts.append(url)
+
+            class Response:
+                def json(self):
+                    return {"response": "generated"}
+            return Response()
+
+    class FakeClients(ProviderClients):
+        def _create(self, provider, api_key, base_url):
+            return FakeSession()
+
+    clients = FakeClients()
+    executor = AIModelExecutor(provider="ollama", api_key="unused", model="llama2")
+    context = {"clients": clients}
+
+    assert executor.execute(make_task(), context) == "generated"
+    assert executor.execute(make_task(), context) == "generated"
+    assert clients.get("ollama", "unused").posts == [
+        "http://localhost:11434/api/generate",
+        "http://localhost:11434/api/generate",
+    ]
+
+
+def test_llm_cache_tiers(tmp_path):
+    """Test memory and disk tiers of the completion cache."""
+    from moltswarm.cache import LLMResponseCache
+
+    path = str(tmp_path / "llm.sqlite")
+    cache = LLMResponseCache(path=path)
+    key = cache.key("ollama", "llama2", "Explain   this\n code")
+
+    assert key == cache.key("ollama", "llama2", "Explain this code")
+    assert key != cache.key("ollama", "mistral", "Explain this code")
+    assert cache.get(key) is None
+
+    cache.put(key, "answer")
+    assert cache.get(key) == "answer"
+    cache.close()
+
+    reopened = LLMResponseCache(path=path)
+    assert reopened.get(key) == "answer"
+    assert reopened.get(key) == "answer"
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    reopened.close()
+
+
+def test_llm_cache_eviction(tmp_path):
+    """Test TTL expiry and disk size bounds."""
+    from moltswarm.cache import LLMResponseCache
+
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"), max_memory_entries=1, max_disk_bytes=10)
+    cache.put("a", "x" * 6)
+    cache.put("b", "y" * 6)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl = 0
+    cache.put("c", "z")
+    assert cache.get("c") is None
+    cache.close()
+
+
+def test_ai_model_executor_caches_completions():
+    """Test that successful completions are served from the cache."""
+    from moltswarm.cache import LLMResponseCache
+    from moltswarm.executors import AIModelExecutor
+
+    calls = []
+
+    class Executor(AIModelExecutor):
+        def _execute_ollama(self, prompt, context, usage=None):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise RuntimeError("down")
+            return "generated"
+
+    executor = Executor(provider="ollama", api_key="unused", model="llama2", cache=LLMResponseCache())
+
+    assert executor.execute(make_task(), {}) == "Ollama Error: down"
+    assert executor.execute(make_task(), {}) == "generated"
+    assert executor.execute(make_task(), {}) == "generated"
+    assert len(calls) == 2
+    assert executor.cache.stats()["hit_rate"] == 1 / 3
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.lines = lines
+        self.closed = False
+
+    def iter_lines(self):
+        for line in self.lines:
+            yield json.dumps(line).encode()
+
+    def close(self):
+        self.closed = True
+
+
+def make_stream_executor(lines, **kwargs):
+    from moltswarm.executors import AIModelExecutor, ProviderClients
+
+    response = FakeStreamResponse(lines)
+
+    class FakeSession:
+        def post(self, url, json=None, timeout=None, stream=False):
+            assert json["stream"] and stream
+            return response
+
+    class FakeClients(ProviderClients):
+        def _create(self, provider, api_key, base_url):
+            return FakeSession()
+
+    executor = AIModelExecutor(provider="ollama", api_key="unused", clients=FakeClients(), **kwargs)
+    return executor, response
+
+
+def test_ai_model_executor_stream():
+    """Test streaming chunks and closing the upstream response."""
+    from moltswarm.cache import LLMResponseCache
+
+    lines = [{"response": "Hel"}, {"response": "lo"}, {"response": "", "done": True}]
+    executor, response = make_stream_executor(lines, cache=LLMResponseCache())
+
+    assert list(executor.stream(make_task())) == ["Hel", "lo"]
+    assert response.closed
+    assert list(executor.stream(make_task())) == ["Hello"]
+
+
+def test_ai_model_executor_stream_cancel():
+    """Test that cancellation stops the stream and skips the cache."""
+    import threading
+    from moltswarm.cache import LLMResponseCache
+
+    lines = [{"response": "a"}, {"response": "b"}, {"response": "c"}]
+    executor, response = make_stream_executor(lines, cache=LLMResponseCache())
+    cancel = threading.Event()
+
+    chunks = []
+    for chunk in executor.stream(make_task(), cancel=cancel):
+        chunks.append(chunk)
+        cancel.set()
+
+    assert chunks == ["a"]
+    assert response.closed
+    assert executor.cache.stats()["stores"] == 0
+
+
+def test_ai_model_executor_astream():
+    """Test the async iterator, including leaving it early."""
+    lines = [{"response": "a"}, {"response": "b"}, {"error": "model crashed"}]
+
+    async def collect(limit):
+        executor, response = make_stream_executor(lines)
+        chunks = []
+        try:
+            async for chunk in executor.astream(make_task()):
+                chunks.append(chunk)
+                if len(chunks) == limit:
+                    break
+        except RuntimeError as e:
+            chunks.append(str(e))
+        await asyncio.sleep(0.05)
+        return chunks, response.closed
+
+    assert asyncio.run(collect(1)) == (["a"], True)
+    assert asyncio.run(collect(10)) == (["a", "b", "Ollama Error: model crashed"], True)
+
+
+def test_ollama_scheduler_serializes_requests():
+    """Test that the scheduler limits concurrent generations in FIFO order."""
+    import threading
+    from moltswarm.executors import OllamaScheduler
+
+    scheduler = OllamaScheduler(parallel=1)
+    active = []
+    peak = []
+    order = []
+
+    def work(i):
+        with scheduler.slot():
+            active.append(i)
+            peak.append(len(active))
+            order.append(i)
+            time.sleep(0.02)
+            active.remove(i)
+
+    threads = []
+    for i in range(4):
+        thread = threading.Thread(target=work, args=(i,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    stats = scheduler.stats()
+    assert max(peak) == 1
+    assert order == [0, 1, 2, 3]
+    assert stats["completed"] == 4
+    assert stats["max_wait"] > 0.02
+    assert stats["avg_generate"] >= 0.02
+
+
+def test_ollama_scheduler_keep_alive_and_preload():
+    """Test keep-alive on requests and model preload on prewarm."""
+    from moltswarm.executors import AIModelExecutor, OllamaScheduler, ProviderClients
+
+    posts = []
+
+    class FakeSession:
+        def post(self, url, json=None, timeout=None):
+            posts.append(json)
+
+            class Response:
+                def json(self):
+                    return {"response": "generated"}
+            return Response()
+
+    class FakeClients(ProviderClients):
+        def _create(self, provider, api_key, base_url):
+            return FakeSession()
+
+    scheduler = OllamaScheduler(keep_alive="1h")
+    executor = AIModelExecutor(
+        provider="ollama", api_key="unused", model="mistral", clients=FakeClients(), scheduler=scheduler
+    )
+    executor.prewarm()
+
+    assert executor.execute(make_task()) == "generated"
+    assert posts[0] == {"model": "mistral", "keep_alive": "1h"}
+    assert posts[1]["keep_alive"] == "1h"
+    assert scheduler.stats()["completed"] == 1
+
+
+class SlowExecutor(Executor):
+    """Executor stub with a fixed delay and result."""
+
+    def __init__(self, delay, result="ok", error=None):
+        self.delay = delay
+        self.result = result
+        self.error = error
+        self.cancelled = False
+
+    def execute(self, task, context=None):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def execute_async(self, task, context=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_hybrid_executor_falls_through_errors():
+    """Test that failing strategies hand the task to the next one."""
+    from moltswarm.executors import HybridExecutor
+
+    executor = HybridExecutor(
+        ai_executor=SlowExecutor(0, "OpenAI Error: quota"),
+        tool_executor=SlowExecutor(0, error=RuntimeError("missing binary")),
+        fallback=SlowExecutor(0, "rules"),
+    )
+
+    assert executor.execute(make_task()) == "rules"
+    stats = executor.stats()
+    assert stats["ai"]["failures"] == 1
+    assert stats["tool"]["failures"] == 1
+    assert stats["fallback"]["wins"] == 1
+
+
+def test_hybrid_executor_hedges_slow_strategy():
+    """Test that a hedge starts after the delay and the loser is cancelled."""
+    from moltswarm.executors import HybridExecutor
+
+    ai = SlowExecutor(5, "slow")
+    tool = SlowExecutor(0.01, "fast")
+    executor = HybridExecutor(ai_executor=ai, tool_executor=tool, hedge_delay=0.05)
+
+    started = time.monotonic()
+    assert asyncio.run(executor.execute_async(make_task())) == "fast"
+    assert time.monotonic() - started < 1
+    assert ai.cancelled
+    stats = executor.stats()
+    assert stats["tool"]["wins"] == 1
+    assert stats["ai"]["cancelled"] == 1
+    assert "fallback" not in stats
+
+
+def test_hybrid_executor_hedges_immediately_on_failure():
+    """Test that a failed racer launches the next strategy without waiting."""
+    from moltswarm.executors import HybridExecutor
+
+    executor = HybridExecutor(
+        ai_executor=SlowExecutor(0, "Anthropic Error: overloaded"),
+        fallback=SlowExecutor(0, "rules"),
+        hedge_delay=10,
+    )
+
+    started = time.monotonic()
+    assert executor.execute(make_task()) == "rules"
+    assert time.monotonic() - started < 1
+
+
+def test_hybrid_executor_quantile_delay():
+    """Test that the hedge delay follows recent latency once sampled."""
+    from moltswarm.executors import HybridExecutor
+
+    executor = HybridExecutor(hedge_delay=1.0, hedge_quantile=0.95, min_samples=3)
+    assert executor._hedge_after("ai") == 1.0
+
+    executor._stats("ai").latencies.extend([0.1, 0.2, 0.3])
+    assert executor._hedge_after("ai") == 0.3
+
+
+def test_execution_result_classification():
+    """Test structured results from error strings and exceptions."""
+    import subprocess
+    from moltswarm.executors import ExecutionResult
+
+    assert ExecutionResult.from_output("done").ok
+    assert ExecutionResult.from_output("OpenAI Error: 500").status == "error"
+    assert ExecutionResult.from_output("Error: Command timed out").status == "timeout"
+    assert ExecutionResult.from_exception(subprocess.TimeoutExpired("x", 1)).status == "timeout"
+
+    result = SlowExecutor(0, error=ValueError("bad")).run(make_task())
+    assert result.status == "error"
+    assert result.error == "bad"
+    assert ExecutionResult("success", prompt_tokens=10, completion_tokens=5).tokens == 15
+
+
+def test_ai_model_executor_reports_tokens():
+    """Test that run() carries provider token usage."""
+    from moltswarm.executors import AIModelExecutor, ProviderClients
+
+    class FakeSession:
+        def post(self, url, json=None, timeout=None):
+            class Response:
+                def json(self):
+                    return {"response": "generated", "prompt_eval_count": 12, "eval_count": 30}
+            return Response()
+
+    class FakeClients(ProviderClients):
+        def _create(self, provider, api_key, base_url):
+            return FakeSession()
+
+    executor = AIModelExecutor(provider="ollama", api_key="unused", clients=FakeClients())
+    result = executor.run(make_task())
+
+    assert result.ok
+    assert result.output == "generated"
+    assert (result.prompt_tokens, result.completion_tokens) == (12, 30)
+
+
+def test_hybrid_executor_breaker_skips_sick_backend():
+    """Test that an open breaker skips the backend until a probe is due."""
+    from moltswarm.executors import HybridExecutor
+
+    calls = []
+
+    class Failing(Executor):
+        def execute(self, task, context=None):
+            calls.append(1)
+            return "OpenAI Error: 503"
+
+    executor = HybridExecutor(ai_executor=Failing(), breaker_threshold=2, breaker_reset_timeout=0.05)
+
+    for _ in range(5):
+        result = executor.run(make_task())
+        assert result.backend == "fallback"
+    assert len(calls) == 2
+    stats = executor.stats()["ai"]
+    assert stats["skipped"] == 3
+    assert stats["breaker"] == "open"
+    assert stats["health"] < 0.5
+
+    time.sleep(0.06)
+    executor.run(make_task())
+    assert len(calls) == 3
+
+
+def test_hybrid_executor_demotes_unhealthy_backend():
+    """Test that a low health score moves a backend behind healthy ones."""
+    from moltswarm.executors import HybridExecutor
+
+    executor = HybridExecutor(ai_executor=SlowExecutor(0, "ai"), tool_executor=SlowExecutor(0, "tool"))
+    executor._stats("ai").outcomes.extend([False] * 10)
+
+    assert [name for name, _ in executor._strategies(make_task())] == ["tool", "ai", "fallback"]
+    assert executor.run(make_task()).backend == "tool"
+
+
+def test_ai_model_executor_respects_budget():
+    """Test that requests are charged to the budget and refused when it is spent."""
+    from moltswarm.budget import BudgetManager, ProviderBudget
+    from moltswarm.executors import AIModelExecutor
+
+    class Executor(AIModelExecutor):
+        def _execute_ollama(self, prompt, context, usage=None):
+            usage.update(prompt_tokens=100, completion_tokens=100)
+            return "generated"
+
+    budget = BudgetManager({"ollama": ProviderBudget(daily_cost=0.5, cost_per_1k_completion=1.0)})
+    executor = Executor(provider="ollama", api_key="unused", budget=budget)
+    executor.max_tokens = 200
+
+    assert executor.execute(make_task()) == "generated"
+    assert budget.stats()["ollama"]["spent_today"] == pytest.approx(0.1)
+    executor.max_tokens = 500
+    assert executor.execute(make_task()).startswith("Error: ollama daily budget")
+
+
+def test_hybrid_executor_sync_hedge_does_not_wait_for_losers():
+    """Test that the sync path returns as soon as the hedge wins."""
+    from moltswarm.executors import HybridExecutor
+
+    ai = SlowExecutor(1.0, "slow")
+    tool = SlowExecutor(0.01, "fast")
+    executor = HybridExecutor(ai_executor=ai, tool_executor=tool, hedge_delay=0.05)
+
+    started = time.monotonic()
+    result = executor.run(make_task())
+
+    assert result.output == "fast"
+    assert result.backend == "tool"
+    assert time.monotonic() - started < 0.5
+    assert executor.stats()["ai"]["cancelled"] == 1
+
+
+def test_run_status_comes_from_exit_code():
+    """Test that built-in executors classify by exit status, not output text."""
+    from moltswarm.executors import AIClaudeCodeExecutor
+
+    ok = ToolExecutor(sys.executable, ["-c", "print('Error: expected output')"]).run(make_task())
+    assert ok.status == "success"
+    assert ok.output == "Error: expected output"
+
+    failed = ToolExecutor(sys.executable, ["-c", "import sys; sys.stderr.write('boom'); sys.exit(3)"]).run(make_task())
+    assert failed.status == "error"
+    assert failed.error == "boom"
+
+    missing = AIClaudeCodeExecutor(claude_path="/nonexistent/claude")
+    assert missing.run(make_task()).status == "error"
+    assert asyncio.run(missing.run_async(make_task())).status == "error"
+
+    crashed = AIClaudeCodeExecutor(claude_path=sys.executable)
+    assert crashed.run(make_task()).status == "error"
+
+
+def test_ai_model_executor_provider_exception_is_error():
+    """Test that provider exceptions become error results with the provider label."""
+    from moltswarm.executors import AIModelExecutor
+
+    class Executor(AIModelExecutor):
+        def _execute_ollama(self, prompt, context, usage=None):
+            raise ConnectionError("refused")
+
+    result = Executor(provider="ollama", api_key="unused").run(make_task())
+    assert result.status == "error"
+    assert result.output == "Ollama Error: refused"
+    assert result.error == "refused"
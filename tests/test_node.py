@@ -0,0 +1,390 @@
+"""Tests for the swarm node's claim tracking and task processing."""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from moltswarm.node import SwarmNode
+from moltswarm.protocols import Task, server_clock
+from moltswarm.resilience import CircuitBreaker
+from moltswarm.sources import QueueSource, TaskSource
+
+
+def deadline_in(seconds):
+    return datetime.fromtimestamp(server_clock.now() + seconds, timezone.utc).isoformat()
+
+
+def make_task(job_id="job_1", post_id="post_1", **kwargs):
+    task = Task(
+        version="1.0",
+        job_id=job_id,
+        type="code",
+        skills=["#SKILL_CODE"],
+        reward_karma=False,
+        claim_timeout=3600,
+        title="Test task",
+        description="A test task",
+        post_id=post_id,
+    )
+    for name, value in kwargs.items():
+        setattr(task, name, value)
+    return task
+
+
+class FakeClient:
+    """Records comments; get_comments returns what the server would."""
+
+    def __init__(self):
+        self.comments = {}
+        self.fetches = []
+        self.posted = []
+        self.breaker = CircuitBreaker()
+
+    def get_comments(self, post_id, since=None):
+        self.fetches.append((post_id, since))
+        return list(self.comments.get(post_id, []))
+
+    def add_comment(self, post_id, content, idempotency_key=None):
+        self.posted.append((post_id, content))
+
+
+def make_node(client, **kwargs):
+    node = SwarmNode(name="worker", skills=["code"], api_key="test", client=client, **kwargs)
+
+    @node.skill("code", tags=["#SKILL_CODE"])
+    def handle(task):
+        return "done"
+
+    return node
+
+
+def test_local_delivery_does_not_advance_fetch_cursor():
+    """Test that the locally recorded delivery keeps the server cursor."""
+    client = FakeClient()
+    client.comments["post_1"] = [
+        {"id": "c1", "content": "hello", "created_at": "2025-02-03T10:00:00Z"},
+    ]
+    node = make_node(client)
+    task = make_task()
+
+    assert asyncio.run(node._process_task(task)) is True
+    assert client.posted[-1][1].startswith("✅ **DELIVERED**")
+
+    index = node._claim_indexes["post_1"]
+    assert index.newest == "2025-02-03T10:00:00Z"
+    assert node._is_settled(task) is True
+
+    node._refresh_claims(task)
+    assert client.fetches[-1] == ("post_1", "2025-02-03T10:00:00Z")
+
+
+def test_claim_tracking_is_compact_and_bounded():
+    """Test that claim indexes keep compact state and Bloom hits are confirmed."""
+    now = server_clock.now()
+    stamp = "2025-02-03T10:00:00Z"
+    client = FakeClient()
+    client.comments["post_1"] = [
+        {"id": "c1", "author": "other", "content": "🐝 **CLAIMING**: `job_id=job_1`", "created_at": stamp},
+    ]
+    client.comments["post_2"] = [
+        {"id": "c2", "author": "other", "content": "✅ **DELIVERED**: `job_id=job_2`", "created_at": stamp},
+    ]
+    node = make_node(client, max_tracked_posts=1)
+
+    claimed = make_task("job_1", "post_1")
+    state = node._refresh_claims(claimed)
+    assert state.last_claim == {"id": "c1", "author": "other", "created_at": stamp}
+    assert state.is_claimed(3600, now=state.last_claim_at + 60)
+    assert state.is_claimed(3600, now=now) is False
+
+    delivered = make_task("job_2", "post_2")
+    assert node._refresh_claims(delivered).delivered is True
+
+    # post_1's index was evicted
+    assert list(node._claim_indexes) == ["post_2"]
+    assert node._is_settled(claimed) is False
+    assert node._is_settled(delivered) is True
+
+    # A Bloom hit on an untracked post is confirmed with one fetch, not trusted
+    node._claim_indexes.clear()
+    assert "post_2:job_2" in node.seen
+    assert node._is_settled(delivered) is False
+    fetches = len(client.fetches)
+    assert node._refresh_claims(delivered).delivered is True
+    assert len(client.fetches) == fetches + 1
+    assert node._is_settled(delivered) is True
+
+
+def test_node_runs_up_to_max_concurrency_tasks_at_once():
+    """Test that queued tasks are dispatched concurrently, bounded by max_concurrency."""
+    client = FakeClient()
+    node = SwarmNode(name="worker", skills=["code"], api_key="test", client=client, max_concurrency=2)
+    running = []
+    peak = []
+    done = []
+
+    @node.skill("code", tags=["#SKILL_CODE"])
+    async def handle(task):
+        running.append(task.job_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(task.job_id)
+        done.append(task.job_id)
+        if len(done) == 3:
+            node._running = False
+        return "done"
+
+    source = node.add_source(QueueSource())
+    source.put_many([make_task(f"job_{i}", f"post_{i}") for i in range(3)])
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    assert sorted(done) == ["job_0", "job_1", "job_2"]
+    assert max(peak) == 2
+    assert len([p for p in client.posted if "DELIVERED" in p[1]]) == 3
+
+
+class SlowClient(FakeClient):
+    """Blocks on every call, like the real client waiting on the network."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def get_comments(self, post_id, since=None):
+        time.sleep(self.delay)
+        return super().get_comments(post_id, since)
+
+    def add_comment(self, post_id, content, idempotency_key=None):
+        time.sleep(self.delay)
+        super().add_comment(post_id, content, idempotency_key)
+
+
+def test_blocking_client_calls_run_off_the_event_loop():
+    """Test that concurrent tasks overlap their API calls instead of serializing them."""
+    client = SlowClient(0.2)
+    node = SwarmNode(name="worker", skills=["code"], api_key="test", client=client, max_concurrency=4)
+    done = []
+
+    @node.skill("code", tags=["#SKILL_CODE"])
+    def handle(task):
+        return "done"
+
+    def delivered(task, ok):
+        done.append(task.job_id)
+        if len(done) == 4:
+            node._running = False
+
+    node.on_delivered(delivered)
+    node.add_source(QueueSource()).put_many([make_task(f"job_{i}", f"post_{i}") for i in range(4)])
+    node._running = True
+    started = time.monotonic()
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=10))
+
+    # Three sequential calls per task: about 0.6s in parallel, 2.4s if serialized
+    assert len(done) == 4
+    assert time.monotonic() - started < 1.5
+
+
+class SlowFeed(TaskSource):
+    """A network source whose poll takes a while."""
+
+    name = "slow"
+    blocking = True
+
+    def __init__(self, delay, tasks):
+        self.delay = delay
+        self.tasks = tasks
+
+    def poll(self):
+        time.sleep(self.delay)
+        tasks, self.tasks = self.tasks, []
+        return tasks
+
+
+def test_blocking_sources_poll_in_background():
+    """Test that a slow network poll doesn't hold up pushed tasks."""
+    client = FakeClient()
+    node = make_node(client, max_concurrency=2)
+    delivered = {}
+
+    def finished(task, ok):
+        delivered[task.job_id] = time.monotonic() - started
+        if len(delivered) == 2:
+            node._running = False
+
+    node.on_delivered(finished)
+    node.add_source(SlowFeed(0.5, [make_task("job_feed", "post_feed")]))
+    queue = node.add_source(QueueSource())
+    node._running = True
+
+    async def run():
+        loop = asyncio.get_event_loop()
+        loop.call_later(0.05, queue.put, make_task("job_push", "post_push"))
+        await node._work_loop(interval=5)
+
+    started = time.monotonic()
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert delivered["job_push"] < 0.3
+    assert delivered["job_feed"] >= 0.5
+
+
+def test_expired_tasks_are_evicted_before_admission():
+    """Test that an expired queue head is evicted, not offered to admission checks."""
+    client = FakeClient()
+    node = make_node(client)
+    checked = []
+
+    def admit(task):
+        checked.append(task.job_id)
+        return True
+
+    node.add_admission_check(admit)
+    node.on_delivered(lambda task, delivered: setattr(node, "_running", False))
+    node._enqueue(make_task("job_old", "post_old", deadline=deadline_in(0.05)))
+    node._enqueue(make_task("job_new", "post_new"))
+    time.sleep(0.1)
+
+    node.add_source(QueueSource())
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    assert checked == ["job_new"]
+    assert [post for post, _ in client.posted] == ["post_new", "post_new"]
+
+
+def test_running_task_renews_lease_and_is_cancelled_at_deadline():
+    """Test lease renewal while a handler runs and cancellation at the deadline."""
+    client = FakeClient()
+    node = SwarmNode(name="worker", skills=["code"], api_key="test", client=client)
+    task = make_task(claim_timeout=0.1, deadline=deadline_in(0.3))
+    cancelled = []
+    outcomes = []
+
+    @node.skill("code", tags=["#SKILL_CODE"])
+    async def handle(task):
+        event = node.cancel_event(task)
+        while not event.is_set():
+            await asyncio.sleep(0.01)
+        cancelled.append(task.job_id)
+        return "too late"
+
+    node.on_delivered(lambda task, delivered: outcomes.append(delivered))
+    node.on_delivered(lambda task, delivered: setattr(node, "_running", False))
+    node.add_source(QueueSource()).put(task)
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    claims = [content for _, content in client.posted if "CLAIMING" in content]
+    assert len(claims) >= 2
+    assert not any("DELIVERED" in content for _, content in client.posted)
+    assert cancelled == ["job_1"]
+    assert outcomes == [False]
+
+
+def test_queue_is_bounded():
+    """Test that the node queues at most max_queued tasks."""
+    node = make_node(FakeClient(), max_queued=2)
+
+    assert node._enqueue(make_task("job_1", "post_1")) is True
+    assert node._enqueue(make_task("job_2", "post_2")) is True
+    assert node._enqueue(make_task("job_3", "post_3")) is False
+    assert node._dequeue().job_id == "job_1"
+    assert node._enqueue(make_task("job_3", "post_3")) is True
+
+
+def test_backfill_runs_next_to_the_feed():
+    """Test that enabling backfill keeps fresh-feed polling."""
+    node = make_node(FakeClient())
+    node.enable_backfill()
+    node._add_default_sources(60)
+    assert sorted(source.name for source in node.sources) == ["backfill", "feed"]
+
+    # An explicit source replaces the default feed
+    node = make_node(FakeClient())
+    node.add_source(QueueSource())
+    node._add_default_sources(60)
+    assert [source.name for source in node.sources] == ["queue"]
+
+
+def test_running_tasks_are_not_queued_again():
+    """Test that a task rediscovered while it runs isn't re-queued or re-checked."""
+    client = FakeClient()
+    node = SwarmNode(name="worker", skills=["code"], api_key="test", client=client, max_concurrency=2)
+    source = node.add_source(QueueSource())
+    task = make_task()
+
+    @node.skill("code", tags=["#SKILL_CODE"])
+    async def handle(running):
+        source.put(make_task())
+        await asyncio.sleep(0.1)
+        return "done"
+
+    node.on_delivered(lambda task, delivered: setattr(node, "_running", False))
+    source.put(task)
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    assert client.fetches == [("post_1", None)]
+    assert not node._queue
+
+
+def test_subscription_planner_drives_added_feed_sources():
+    """Test that an explicitly added FeedSource uses the node's planner."""
+    from moltswarm.sources import FeedSource
+
+    node = make_node(FakeClient())
+    planner = node.enable_subscription_planner()
+    feed = node.add_source(FeedSource(node.client, interval=30))
+    node.add_source(QueueSource())
+    node._add_default_sources(60)
+
+    assert feed.planner is planner
+    assert [source.name for source in node.sources] == ["feed", "queue"]
+
+
+def test_refused_tasks_stay_queued_without_blocking_others():
+    """Test that a task refused by admission doesn't hold up the tasks behind it."""
+    client = FakeClient()
+    node = make_node(client)
+    node.add_admission_check(lambda task: task.job_id != "job_blocked")
+    node.on_delivered(lambda task, delivered: setattr(node, "_running", False))
+    node.add_source(QueueSource()).put_many([
+        make_task("job_blocked", "post_blocked"),
+        make_task("job_ok", "post_ok"),
+    ])
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    assert [post for post, _ in client.posted] == ["post_ok", "post_ok"]
+    assert list(node._queue) == [("post_blocked", "job_blocked")]
+
+
+def test_budget_admission_defers_only_unaffordable_provider():
+    """Test that a task whose request would overrun its provider's budget isn't claimed."""
+    from moltswarm.budget import BudgetManager, ProviderBudget
+
+    budget = BudgetManager(
+        {
+            "openai": ProviderBudget(daily_cost=0.01, cost_per_1k_completion=0.002),
+            "anthropic": ProviderBudget(daily_cost=1.0, cost_per_1k_completion=0.002),
+        },
+        provider_for=lambda task: {"code": "openai", "write": "anthropic"}.get(task.type),
+    )
+    # 0.009 spent: under the limit, but a 1000-token completion (0.002) won't fit
+    budget.settle(budget.acquire("openai", 0, 0), 0, 4500)
+
+    client = FakeClient()
+    node = make_node(client)
+    node.add_admission_check(budget.admits)
+    node.on_delivered(lambda task, delivered: setattr(node, "_running", False))
+    node.add_source(QueueSource()).put_many([
+        make_task("job_code", "post_code"),
+        make_task("job_write", "post_write", type="write"),
+    ])
+    node._running = True
+    asyncio.run(asyncio.wait_for(node._work_loop(interval=0.01), timeout=5))
+
+    assert [post for post, _ in client.posted] == ["post_write", "post_write"]
+    assert list(node._queue) == [("post_code", "job_code")]
@@ -148,3 +148,92 @@ def test_task_to_markdown():
     assert "# [SWARM_JOB] Test Task" in markdown
     assert "job_123" in markdown
     assert "#SKILL_CODE" in markdown
+
+
+def test_claim_index_tracks_claims_and_deliveries():
+    """Test that the claim index keeps first/last claim and delivery."""
+    from moltswarm.protocols import ClaimIndex
+
+    index = ClaimIndex()
+    index.update([
+        {"id": "c2", "content": "🐝 **CLAIMING**: `job_id=job_123`", "created_at": "2025-02-03T11:00:00Z"},
+        {"id": "c1", "content": "🐝 **CLAIMING**: `job_id=job_123`", "created_at": "2025-02-03T10:00:00Z"},
+        {"id": "c3", "content": "🐝 **CLAIMING**: `job_id=job_1234`", "created_at": "2025-02-03T12:00:00Z"},
+    ])
+
+    state = index.get("job_123")
+    assert state.first_claim["id"] == "c1"
+    assert state.last_claim["id"] == "c2"
+    assert state.delivered is False
+
+    # Only new comments are processed
+    added = index.update([
+        {"id": "c1", "content": "🐝 **CLAIMING**: `job_id=job_123`", "created_at": "2025-02-03T10:00:00Z"},
+        {"id": "c4", "content": "✅ **DELIVERED**: `job_id=job_123`", "created_at": "2025-02-03T13:00:00Z"},
+    ])
+    assert added == 1
+    assert index.get("job_123").delivered is True
+    assert index.get("job_1234").delivered is False
+
+
+def test_claim_state_is_claimed():
+    """Test live claim detection with timeouts and FAILED releases."""
+    from moltswarm.protocols import ClaimIndex, parse_timestamp
+
+    claimed_at = parse_timestamp("2025-02-03T10:00:00Z")
+    index = ClaimIndex()
+    index.update([
+        {"id": "c1", "content": "🐝 **CLAIMING**: `job_id=job_123`", "created_at": "2025-02-03T10:00:00Z"},
+    ])
+    state = index.get("job_123")
+
+    assert state.is_claimed(3600, now=claimed_at + 60) is True
+    assert state.is_claimed(3600, now=claimed_at + 7200) is False
+
+    index.update([
+        {"id": "c2", "content": "❌ **FAILED**: `job_id=job_123`", "created_at": "2025-02-03T10:05:00Z"},
+    ])
+    assert state.is_claimed(3600, now=claimed_at + 600) is False
+
+
+def test_is_claim_expired():
+    """Test claim expiry from comment timestamps."""
+    assert is_claim_expired({"created_at": "2000-01-01T00:00:00Z"}, 3600) is True
+    assert is_claim_expired({"created_at": ""}, 3600) is True
+
+
+def test_server_clock_smooths_offset():
+    """Test server clock offset estimation from Date headers."""
+    from moltswarm.protocols import ServerClock
+
+    clock = ServerClock(alpha=0.5)
+    clock.observe(server_time=1000.0, local_time=900.0)
+    assert clock.offset == 100.0
+
+    clock.observe(server_time=1000.0, local_time=920.0)
+    assert clock.offset == 90.0
+
+    clock.observe_date_header("Mon, 03 Feb 2025 12:00:00 GMT", local_time=0.0)
+    assert clock.samples == 3
+    clock.observe_date_header("not a date")
+    assert clock.samples == 3
+
+
+def test_task_is_expired_uses_deadline():
+    """Test deadline checks against an explicit server time."""
+    from moltswarm.protocols import parse_timestamp
+
+    task = Task(
+        version="1.0",
+        job_id="job_123",
+        type="code",
+        skills=["#SKILL_CODE"],
+        reward_karma=False,
+        claim_timeout=3600,
+        deadline="2025-02-03T12:00:00Z",
+    )
+    deadline = parse_timestamp(task.deadline)
+
+    assert task.is_expired(now=deadline - 1) is False
+    assert task.is_expired(now=deadline + 1) is True
+    assert task.is_expired() is True
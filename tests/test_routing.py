@@ -0,0 +1,88 @@
+"""Tests for adaptive executor routing."""
+
+from moltswarm.executors import Executor
+from moltswarm.protocols import Task
+from moltswarm.routing import ExecutorRouter
+
+
+def make_task(job_id="job_1", task_type="code"):
+    return Task(
+        version="1.0",
+        job_id=job_id,
+        type=task_type,
+        skills=["#SKILL_CODE"],
+        reward_karma=False,
+        claim_timeout=3600,
+        title="Test task",
+        description="A test task",
+        post_id=f"post_{job_id}",
+    )
+
+
+class Fixed(Executor):
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def execute(self, task, context=None):
+        self.calls += 1
+        return self.result
+
+
+def test_router_learns_best_backend():
+    """Test that the router converges on the backend that succeeds."""
+    good = Fixed("def answer(): return 42")
+    bad = Fixed("OpenAI Error: 500")
+    router = ExecutorRouter({"bad": bad, "good": good}, exploration=0.2)
+
+    for i in range(40):
+        task = make_task(f"job_{i}")
+        router.execute(task)
+        router.record_outcome(task, delivered=True)
+
+    assert good.calls > 30
+    stats = router.stats()["code"]
+    assert stats["good"]["reward"] > stats["bad"]["reward"]
+
+
+def test_router_scores_delivery_outcome():
+    """Test that undelivered results are not rewarded."""
+    router = ExecutorRouter({"ai": Fixed("result")})
+    task = make_task()
+
+    assert router.execute(task) == "result"
+    assert len(router.history) == 0
+
+    router.record_outcome(task, delivered=False)
+    entry = router.history[-1]
+    assert entry["backend"] == "ai"
+    assert entry["delivered"] is False
+    assert entry["reward"] == 0.0
+    assert entry["expected_latency"] is None
+
+
+def test_router_routes_per_task_type():
+    """Test that each task type keeps its own estimates."""
+    router = ExecutorRouter({"a": Fixed("x"), "b": Fixed("y")})
+    for task_type in ("code", "write"):
+        task = make_task(task_type=task_type)
+        router.execute(task)
+        router.record_outcome(task, delivered=True, upvotes=2)
+
+    assert set(router.stats()) == {"code", "write"}
+    assert router.history[-1]["reward"] > 1.0
+
+
+def test_router_spreads_tasks_before_outcomes_arrive():
+    """Test that routed tasks awaiting their outcome count as tries."""
+    router = ExecutorRouter({name: Fixed("ok") for name in "abc"})
+
+    backends = [router.route(make_task(f"job_{i}")).backend for i in range(6)]
+    assert sorted(backends) == ["a", "a", "b", "b", "c", "c"]
+
+    # Successful runs stay in flight until record_outcome()
+    for i in range(3):
+        router.execute(make_task(f"run_{i}"))
+    assert router.stats()["code"]["a"]["in_flight"] == 3
+    router.record_outcome(make_task("run_0"), delivered=True)
+    assert sum(arm["in_flight"] for arm in router.stats()["code"].values()) == 8
@@ -0,0 +1,40 @@
+"""Tests for MoltSwarm seen-set."""
+
+from moltswarm.seen import BloomFilter, SeenSet
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that added keys are always found."""
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"post_{i}:job_{i}")
+
+    assert all(f"post_{i}:job_{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other_{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_seen_set_rotates_generations():
+    """Test that old generations are dropped after rotation."""
+    seen = SeenSet(capacity=100, generations=2)
+
+    for i in range(50):
+        seen.add(f"old_{i}")
+    for i in range(100):
+        seen.add(f"new_{i}")
+
+    assert seen.stats()["rotations"] >= 1
+    assert seen.stats()["generations"] == 2
+    assert all(f"new_{i}" in seen for i in range(50, 100))
+    assert sum(f"old_{i}" in seen for i in range(50)) < 10
+
+
+def test_seen_set_memory_ceiling():
+    """Test that max_bytes bounds filter memory."""
+    seen = SeenSet(capacity=1000000, max_bytes=64 * 1024)
+    for i in range(1000):
+        seen.add(str(i))
+
+    stats = seen.stats()
+    assert stats["bytes"] <= 64 * 1024
+    assert stats["items"] == 1000
@@ -61,3 +61,68 @@ def test_find_handler():
 
     handler = registry.find_handler(["#SKILL_WRITE"])
     assert handler is None
+
+
+def test_find_handler_prefers_exact_match():
+    """Test that exact tag matches beat substring matches."""
+    registry = SkillRegistry()
+
+    @registry.register("code", tags=["#SKILL_CODE"])
+    def handle_code(task):
+        return "code"
+
+    @registry.register("python", tags=["#SKILL_PYTHON_CODE"])
+    def handle_python(task):
+        return "python"
+
+    handler = registry.find_handler(["#SKILL_PYTHON_CODE"])
+    assert handler(None) == "python"
+
+
+def test_find_handler_prefers_more_overlap():
+    """Test that skills covering more task tags win."""
+    registry = SkillRegistry()
+
+    @registry.register("code", tags=["#SKILL_CODE"])
+    def handle_code(task):
+        return "code"
+
+    @registry.register("python", tags=["#SKILL_CODE", "#SKILL_PYTHON"])
+    def handle_python(task):
+        return "python"
+
+    assert registry.find_handler(["#SKILL_CODE", "#SKILL_PYTHON"])(None) == "python"
+    assert registry.find_handler(["#SKILL_CODE"])(None) == "code"
+
+
+def test_register_invalidates_dispatch_cache():
+    """Test that registering a skill refreshes memoized lookups."""
+    registry = SkillRegistry()
+
+    assert registry.find_handler(["#SKILL_WRITE"]) is None
+    assert registry.can_handle(["#SKILL_WRITE"]) is False
+
+    @registry.register("write", tags=["#SKILL_WRITE"])
+    def handle_write(task):
+        return "text"
+
+    assert registry.find_handler(["#SKILL_WRITE"])(None) == "text"
+    assert registry.can_handle(["#skill_write"]) is True
+
+
+def test_match_cache_is_normalized_and_bounded():
+    """Test that equivalent skill lists share a cache entry and the cache is capped."""
+    registry = SkillRegistry(max_cached_matches=2)
+
+    @registry.register("code", tags=["#SKILL_CODE", "#SKILL_PYTHON"])
+    def handle_code(task):
+        return "code"
+
+    skill = registry.find_skill(["#SKILL_CODE", "#SKILL_PYTHON"])
+    assert registry.find_skill(["#skill_python", "SKILL_CODE"]) is skill
+    assert len(registry._match_cache) == 1
+
+    registry.find_skill(["#SKILL_WRITE"])
+    registry.find_skill(["#SKILL_DATA"])
+    assert len(registry._match_cache) == 2
+    assert ("skill_code", "skill_python") not in registry._match_cache
@@ -0,0 +1,223 @@
+"""Tests for MoltSwarm task sources."""
+
+import http.client
+import json
+import urllib.request
+
+import pytest
+
+from moltswarm.sources import QueueSource, SpoolSource, TaskSource, WebhookSource
+
+
+def make_post(post_id, job_id):
+    """Build a Moltbook post carrying a swarm job."""
+    payload = {
+        "swarm": {"version": "1.0", "job_id": job_id, "type": "code",
+                  "skills": ["#SKILL_CODE"], "reward_karma": False, "claim_timeout": 3600},
+        "task": {"title": "Test", "description": "Test task"},
+    }
+    return {
+        "id": post_id,
+        "author": {"name": "TestUser"},
+        "content": f"# [SWARM_JOB] Test\n\n```json\n{json.dumps(payload)}\n```",
+    }
+
+
+def test_queue_source():
+    """Test queueing tasks in process."""
+    source = QueueSource()
+    notified = []
+    source.start(lambda: notified.append(True))
+
+    assert source.put_post(make_post("p1", "job_1")) is True
+    assert source.put_post({"id": "p2", "content": "not a job"}) is False
+
+    tasks = source.poll()
+    assert [t.job_id for t in tasks] == ["job_1"]
+    assert notified == [True]
+    assert source.poll() == []
+
+
+def test_spool_source_reads_appended_lines(tmp_path):
+    """Test that only newly appended spool lines are parsed."""
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(json.dumps(make_post("p1", "job_1")) + "\n")
+
+    source = SpoolSource(str(path), interval=0)
+    assert [t.job_id for t in source.poll()] == ["job_1"]
+    assert source.poll() == []
+
+    with open(path, "a") as f:
+        f.write(json.dumps(make_post("p2", "job_2")) + "\n")
+        f.write('{"partial":')
+    assert [t.job_id for t in source.poll()] == ["job_2"]
+
+
+def test_webhook_source_accepts_posts():
+    """Test pushing posts to the webhook receiver."""
+    source = WebhookSource(port=0, token="secret")
+    notified = []
+    source.start(lambda: notified.append(True))
+    try:
+        host, port = source.address
+        body = json.dumps({"posts": [make_post("p1", "job_1"), make_post("p2", "job_2")]}).encode()
+        request = urllib.request.Request(
+            f"http://{host}:{port}/tasks",
+            data=body,
+            headers={"Content-Type": "application/json", "X-MoltSwarm-Token": "secret"},
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 202
+            assert json.loads(response.read()) == {"accepted": 2}
+    finally:
+        source.stop()
+
+    assert [t.job_id for t in source.poll()] == ["job_1", "job_2"]
+    assert notified
+
+
+def test_webhook_source_rejects_bad_content_length():
+    """Test that missing, malformed, negative and oversized lengths are refused."""
+    source = WebhookSource(port=0, max_body=16)
+    source.start(lambda: None)
+
+    def post(length):
+        conn = http.client.HTTPConnection(*source.address, timeout=5)
+        try:
+            conn.putrequest("POST", "/tasks")
+            if length is not None:
+                conn.putheader("Content-Length", length)
+            conn.endheaders()
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    try:
+        assert post(None) == 411
+        assert post("ten") == 400
+        assert post("-1") == 400
+        assert post("1000") == 413
+    finally:
+        source.stop()
+    assert source.poll() == []
+
+
+def test_task_source_requires_poll():
+    """Test that TaskSource subclasses must implement poll()."""
+    class Incomplete(TaskSource):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+class FakeFeedClient:
+    """Serves feed pages and comments for backfill tests."""
+
+    def __init__(self, pages, comments=None):
+        self.pages = pages
+        self.comments = comments or {}
+        self.calls = []
+
+    def get_feed_page(self, sort="new", limit=25, submolt=None, cursor=None):
+        self.calls.append(("feed", cursor))
+        index = int(cursor or 0)
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        return self.pages[index], next_cursor
+
+    def search_posts(self, query, post_type="posts", limit=20):
+        self.calls.append(("search", query))
+        return []
+
+    def get_comments(self, post_id, since=None):
+        self.calls.append(("comments", post_id))
+        return self.comments.get(post_id, [])
+
+
+def test_backfill_source_finds_unclaimed_jobs():
+    """Test crawling older pages and skipping claimed or delivered jobs."""
+    from datetime import datetime, timedelta, timezone
+    from moltswarm.sources import BackfillSource
+
+    now = datetime.now(timezone.utc)
+    recent = (now - timedelta(days=1)).isoformat()
+    ancient = (now - timedelta(days=30)).isoformat()
+
+    def post(post_id, created_at):
+        data = make_post(post_id, f"job_{post_id}")
+        data["created_at"] = created_at
+        return data
+
+    client = FakeFeedClient(
+        pages=[
+            [post("p1", recent), post("p2", recent)],
+            [post("p3", recent), post("p4", ancient)],
+            [post("p5", recent)],
+        ],
+        comments={"p2": [{"id": "c1", "content": "✅ **DELIVERED**: `job_id=job_p2`",
+                          "created_at": recent}]},
+    )
+    source = BackfillSource(client, max_age=7 * 86400, interval=0, max_requests=10)
+
+    found = source.poll() + source.poll()
+
+    assert [t.job_id for t in found] == ["job_p1", "job_p3"]
+    assert ("feed", "2") not in client.calls  # stopped at the age cutoff
+    assert source.poll() == []  # waiting for the next pass
+
+
+def test_backfill_source_pauses_when_rate_limited():
+    """Test that backfill stays quiet after a recent 429."""
+    import time
+    from moltswarm.sources import BackfillSource
+
+    client = FakeFeedClient(pages=[[]])
+    client.rate_limited_at = time.monotonic()
+    source = BackfillSource(client, interval=0)
+
+    assert source.poll() == []
+    assert client.calls == []
+
+
+def test_subscription_planner_subscribes_and_skips_global_feed():
+    """Test planning subscriptions from observed job submolts."""
+    from moltswarm.protocols import Task
+    from moltswarm.sources import SubscriptionPlanner
+
+    class FakeSubscribeClient:
+        def __init__(self):
+            self.subscribed = []
+
+        def subscribe(self, name):
+            self.subscribed.append(name)
+
+        def unsubscribe(self, name):
+            self.subscribed.remove(name)
+
+    def task(i, submolt):
+        return Task(version="1.0", job_id=f"job_{i}", type="code", skills=["#SKILL_CODE"],
+                    reward_karma=False, claim_timeout=3600, post_id=f"p{i}", submolt=submolt)
+
+    client = FakeSubscribeClient()
+    planner = SubscriptionPlanner(client, min_samples=10, plan_every=1, global_every=5, target_share=0.9, window=40)
+
+    # Jobs show up in the global feed only, mostly from m/swarm
+    jobs = [task(i, "swarm" if i % 10 else "general") for i in range(20)]
+    assert planner.should_poll_global() is True
+    planner.observe([], jobs)
+    assert client.subscribed == ["swarm"]
+    assert planner.coverage() == 0.0
+
+    # After subscribing, the personalized feed carries the same jobs
+    assert planner.should_poll_global() is True
+    planner.observe(jobs, jobs)
+    assert planner.coverage() == 0.5
+
+    for _ in range(3):
+        planner.should_poll_global()
+        planner.observe(jobs, jobs)
+    assert planner.coverage() >= 0.95
+
+    skipped = [planner.should_poll_global() for _ in range(5)]
+    assert skipped.count(False) == 4
+    assert planner.stats()["requests_saved"] >= 4
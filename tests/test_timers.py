@@ -0,0 +1,49 @@
+"""Tests for MoltSwarm timer queue."""
+
+from moltswarm.timers import TimerQueue
+
+
+def test_timers_fire_in_order():
+    """Test that due timers fire in deadline order."""
+    timers = TimerQueue(clock=lambda: 0.0)
+    fired = []
+
+    timers.schedule(30, fired.append, "c")
+    timers.schedule(10, fired.append, "a")
+    timers.schedule(20, fired.append, "b")
+
+    assert timers.run_due(now=5) == 0
+    assert timers.next_due_in(now=5) == 5
+    assert timers.run_due(now=20) == 2
+    assert fired == ["a", "b"]
+    assert len(timers) == 1
+
+
+def test_cancelled_timers_do_not_fire():
+    """Test lazy cancellation and compaction."""
+    timers = TimerQueue(clock=lambda: 0.0)
+    fired = []
+
+    handles = [timers.schedule(i, fired.append, i) for i in range(200)]
+    for handle in handles[:150]:
+        timers.cancel(handle)
+
+    assert len(timers) == 50
+    assert len(timers._heap) < 200  # compacted
+    timers.run_due(now=1000)
+    assert fired == list(range(150, 200))
+    assert timers.next_due_in() is None
+
+
+def test_schedule_in_uses_clock():
+    """Test relative scheduling."""
+    now = [100.0]
+    timers = TimerQueue(clock=lambda: now[0])
+    fired = []
+
+    timers.schedule_in(10, fired.append, "x")
+    now[0] = 109.0
+    assert timers.run_due() == 0
+    now[0] = 110.0
+    assert timers.run_due() == 1
+    assert fired == ["x"]